@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Ultrasonic Message Queue Test
+Checks store-and-forward dispatch across queue instances
+
+Tests:
+1. A message enqueued by one queue is dispatched by another on the same db
+2. A row written by another process (separate connection) is dispatched
+3. A backing-off message does not hide a ready one behind it
+4. An unacknowledged send counts as a failure and is retried
+5. In-memory queues are private; equivalent file paths share one queue
+6. Closing the last queue on a database closes its connection
+7. bulk_load works while a transaction is already open
+
+Built by: Warp
+Purpose: Regression check for the shared dispatch heap
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from ultrasonic_message_queue import (
+    Message, MessageQueue, MessagePriority, MessageStatus, _SHARED_STATE,
+)
+
+
+def _db_path(name: str) -> str:
+    """Fresh database path in a temporary directory."""
+    return str(Path(tempfile.mkdtemp()) / name)
+
+
+def test_second_queue_dispatches_first_queues_message():
+    """Two MessageQueue instances share one db: either can dispatch."""
+    db_path = _db_path("two_queues.db")
+    sender = MessageQueue(db_path=db_path)
+    dispatcher = MessageQueue(db_path=db_path)
+
+    message_id = sender.enqueue("agent_a", "agent_b", {"text": "hello"})
+
+    message = dispatcher.get_next_message()
+    assert message is not None, "second queue saw no message"
+    assert message.message_id == message_id
+
+    print("✅ Second queue dispatches the first queue's message")
+
+
+def test_row_from_other_process_is_dispatched():
+    """A row inserted through another connection is still picked up."""
+    db_path = _db_path("other_process.db")
+    queue = MessageQueue(db_path=db_path)
+
+    now = time.time()
+    other = sqlite3.connect(db_path)
+    other.execute(
+        "INSERT INTO messages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        ("external01", "agent_x", "agent_y", "{}", MessagePriority.HIGH.value,
+         MessageStatus.PENDING.value, now, now + 3600, 0, 0.0, None),
+    )
+    other.commit()
+    other.close()
+
+    message = queue.get_next_message()
+    assert message is not None, "externally written row was never dispatched"
+    assert message.message_id == "external01"
+
+    print("✅ Rows written by another process are dispatched")
+
+
+def test_backing_off_message_does_not_block_ready_one():
+    """An urgent message in backoff must not hide a ready normal one."""
+    db_path = _db_path("backoff.db")
+    queue = MessageQueue(db_path=db_path)
+
+    urgent_id = queue.enqueue("a", "b", {}, priority=MessagePriority.URGENT)
+    queue.conn.execute(
+        "UPDATE messages SET attempts = 1, last_attempt = ? WHERE message_id = ?",
+        (time.time(), urgent_id),
+    )
+    queue.conn.commit()
+    time.sleep(0.001)  # distinct created_at (and so message_id)
+    normal_id = queue.enqueue("a", "c", {})
+
+    message = queue.get_next_message()
+    assert message is not None and message.message_id == normal_id
+
+    print("✅ Backing-off messages do not block ready ones")
+
+
+def test_ack_timeout_records_failure_and_retries():
+    """A send with no ACK raises the failure rate (for every queue on the db)."""
+    db_path = _db_path("ack_timeout.db")
+    queue = MessageQueue(db_path=db_path, ack_timeout=0.05)
+    observer = MessageQueue(db_path=db_path, ack_timeout=0.05)
+
+    message_id = queue.enqueue("a", "b", {})
+    message = queue.get_next_message()
+    assert message is not None and message.message_id == message_id
+    queue.mark_sent(message_id)
+    assert queue.failure_rate == 0.0
+
+    time.sleep(0.1)  # ACK never arrives
+    queue.get_next_message()  # poll runs the ACK timeout check
+    assert queue.failure_rate == 1.0, f"failure_rate {queue.failure_rate}"
+    assert observer.failure_rate == 1.0, "failure window not shared per database"
+
+    # Requeued as PENDING; ready again once its 2s backoff has passed
+    queue.conn.execute(
+        "UPDATE messages SET last_attempt = ? WHERE message_id = ?",
+        (time.time() - 2.5, message_id),
+    )
+    queue.conn.commit()
+    retry = queue.get_next_message()
+    assert retry is not None and retry.message_id == message_id
+    assert retry.attempts == 1
+
+    print("✅ Unacknowledged sends count as failures and are retried")
+
+
+def test_memory_queues_private_and_paths_resolved():
+    """':memory:' queues do not share; './x.db' and 'x.db' do."""
+    first = MessageQueue(db_path=":memory:")
+    second = MessageQueue(db_path=":memory:")
+    first.enqueue("a", "b", {})
+    assert first.count_pending() == 1
+    assert second.count_pending() == 0, "in-memory queues share a database"
+    assert second.get_next_message() is None
+
+    directory = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        plain = MessageQueue(db_path="resolved.db")
+        dotted = MessageQueue(db_path="./resolved.db")
+    finally:
+        os.chdir(cwd)
+    assert plain.conn is dotted.conn, "equivalent paths opened two connections"
+
+    print("✅ In-memory queues are private; equivalent paths share")
+
+
+def test_close_releases_connection():
+    """The last close() on a database closes and forgets its connection."""
+    db_path = _db_path("close.db")
+    first = MessageQueue(db_path=db_path)
+    second = MessageQueue(db_path=db_path)
+    key = os.path.realpath(db_path)
+
+    first.close()
+    assert key in _SHARED_STATE
+    second.enqueue("a", "b", {})  # still usable
+
+    second.close()
+    assert key not in _SHARED_STATE
+    try:
+        second.conn.execute("SELECT 1")
+    except sqlite3.ProgrammingError:
+        pass
+    else:
+        raise AssertionError("connection still open after last close()")
+
+    reopened = MessageQueue(db_path=db_path)
+    assert reopened.count_pending() == 1
+    reopened.close()
+
+    print("✅ Closing the last queue closes its connection")
+
+
+def test_bulk_load_inside_open_transaction():
+    """bulk_load joins an implicit transaction left open on the connection."""
+    queue = MessageQueue(db_path=_db_path("bulk_open_txn.db"))
+    queue.enqueue("a", "b", {})
+    queue.conn.execute("UPDATE messages SET attempts = attempts")  # opens a transaction
+    assert queue.conn.in_transaction
+
+    now = time.time()
+    messages = [
+        Message(f"bulk{i:02d}", "a", "b", "{}", MessagePriority.NORMAL,
+                MessageStatus.PENDING, now, now + 3600)
+        for i in range(5)
+    ]
+    assert queue.bulk_load(messages) == 5
+    assert not queue.conn.in_transaction, "bulk_load left the transaction open"
+    assert queue.count_pending() == 6
+    queue.close()
+
+    print("✅ bulk_load works inside an open transaction")
+
+
+def main():
+    """Run all tests."""
+    tests = [
+        test_second_queue_dispatches_first_queues_message,
+        test_row_from_other_process_is_dispatched,
+        test_backing_off_message_does_not_block_ready_one,
+        test_ack_timeout_records_failure_and_retries,
+        test_memory_queues_private_and_paths_resolved,
+        test_close_releases_connection,
+        test_bulk_load_inside_open_transaction,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Ultrasonic Phrase Encoder Test
+Checks that chord synthesis keeps concept frequencies exact
+
+Tests:
+1. Adjacent audible concepts stay separable in a chord
+2. The opt-in JIT tone kernel matches the NumPy path
+
+Built by: Warp
+Purpose: Regression check for the inverse-FFT chord path
+"""
+
+import math
+import sys
+
+import numpy as np
+
+from ultrasonic_phrases import NUMBA_AVAILABLE, UltrasonicPhraseEncoder, _envelope
+
+
+def test_adjacent_chord_concepts_separable():
+    """'probable' and 'request' are 0.66 Hz apart; both must survive a chord."""
+    encoder = UltrasonicPhraseEncoder(mode="audible", duration_per_concept=0.3, chord_mode=True)
+    concepts = [
+        ("probable", 1.0, "endorsed", "pure"),
+        ("request", 1.0, "endorsed", "pure"),
+    ]
+    samples = encoder._encode_concepts_chord(concepts, "audible").astype(np.float64)
+
+    # Fit the output with the two exact fundamentals under the chord
+    # envelope; if either partial was moved, the fit leaves a residual
+    num_samples = samples.size
+    t = np.arange(num_samples) / encoder.sample_rate
+    env = _envelope(num_samples, 0.15, 0.25).astype(np.float64)
+    columns = []
+    for concept, *_ in concepts:
+        freq = encoder._get_frequency(concept, "audible")
+        columns += [env * np.sin(2 * math.pi * freq * t), env * np.cos(2 * math.pi * freq * t)]
+    basis = np.column_stack(columns)
+    coeffs, *_ = np.linalg.lstsq(basis, samples, rcond=None)
+
+    residual = np.abs(samples - basis @ coeffs).max()
+    assert residual < 1e-3 * np.abs(samples).max(), f"residual {residual:.3g}"
+
+    # Each concept contributes amplitude 1 / len(concepts)
+    for k in range(len(concepts)):
+        amplitude = math.hypot(coeffs[2 * k], coeffs[2 * k + 1])
+        assert abs(amplitude - 0.5) < 1e-3, f"voice {k} amplitude {amplitude:.4f}"
+
+    print("✅ Adjacent audible concepts stay separable in a chord")
+
+
+def test_jit_matches_numpy():
+    """use_jit=True renders the same phrase as the default NumPy path."""
+    if not NUMBA_AVAILABLE:
+        print("⚠️ numba not installed, skipping JIT check")
+        return
+    concepts = [
+        ("self", 1.0, "endorsed", "pure"),
+        ("wants", 0.8, "endorsed", "rich"),
+    ]
+    for mode in ("audible", "ultrasonic"):
+        numpy_path = UltrasonicPhraseEncoder(mode=mode).encode_phrase(concepts)["samples"]
+        jit_path = UltrasonicPhraseEncoder(mode=mode, use_jit=True).encode_phrase(concepts)["samples"]
+        error = np.abs(numpy_path.astype(np.float64) - jit_path).max()
+        assert error < 1e-5, f"{mode}: JIT differs by {error:.3g}"
+
+    print("✅ JIT tone kernel matches the NumPy path")
+
+
+def main():
+    """Run all tests."""
+    failed = 0
+    for test in (test_adjacent_chord_concepts_separable, test_jit_matches_numpy):
+        try:
+            test()
+        except AssertionError as e:
+            print(f"❌ {test.__name__}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
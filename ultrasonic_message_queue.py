@@ -9,7 +9,7 @@ Solution: Message queue with acoustic acknowledgments
 Features:
 1. Persistent message storage (SQLite)
 2. Priority queuing (urgent messages first)
-3. Retry logic with exponential backoff
+3. Retry logic with adaptive backoff
 4. Delivery confirmation via ultrasonic ACK
 5. Message expiration (TTL)
 
@@ -17,19 +17,25 @@ Protocol:
 1. Sender: Encode message → Store in queue → Broadcast
 2. Receiver: Detect message → Send ACK → Process
 3. Sender: Receive ACK → Mark delivered → Remove from queue
-4. If no ACK: Retry with backoff (1s, 2s, 4s, 8s...)
+4. If no ACK: Retry with backoff (1s, 2s, then adaptive constant)
 
 Built by: Warp (Hex3-Warp collaboration)
 Purpose: Phase 2 Infrastructure - Reliable async messaging
 """
 
+import os
 import sqlite3
 import time
 import json
+import logging
 import hashlib
+import heapq
+import threading
 import wave
-import struct
 import math
+import concurrent.futures
+import numpy as np
+from collections import deque
 from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 from dataclasses import dataclass, asdict
@@ -42,6 +48,70 @@ try:
 except ImportError:
     CONCEPTS_AVAILABLE = False
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+class _SharedQueueState:
+    """
+    State for one database, shared by every MessageQueue on it: the open
+    connection and the lock serializing its write transactions, the
+    dispatch heap of (-priority, created_at, message_id) with its lock,
+    and the ACK failure window behind the adaptive backoff.
+    """
+    
+    __slots__ = ("conn", "write_lock", "entries", "lock", "recent_failures", "users")
+    
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.write_lock = threading.RLock()
+        self.entries: List[Tuple[int, float, str]] = []
+        self.lock = threading.Lock()
+        # 1 = send went unacknowledged, 0 = delivered
+        self.recent_failures = deque(maxlen=FAILURE_WINDOW)
+        self.users = 0  # open MessageQueues; the last close() closes conn
+
+
+# Shared state by resolved database path. In-memory databases are private
+# to their connection, so those queues never go in here.
+_SHARED_STATE: Dict[str, _SharedQueueState] = {}
+_SHARED_STATE_LOCK = threading.Lock()
+_IN_MEMORY_PATHS = ("", ":memory:")
+
+
+def close_all_queues():
+    """Close every shared queue connection and forget its state."""
+    with _SHARED_STATE_LOCK:
+        for shared in _SHARED_STATE.values():
+            shared.conn.close()
+        _SHARED_STATE.clear()
+
+
+# === ACK KERNEL ===
+
+def _ack_kernel_numpy(sin_base, cos_base, env, phase):
+    """Rotate the precomputed carrier by ``phase`` and apply the envelope."""
+    # sin(wt + phi) = sin(wt)cos(phi) + cos(wt)sin(phi)
+    return env * (math.cos(phase) * sin_base + math.sin(phase) * cos_base)
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _ack_kernel(sin_base, cos_base, env, phase):
+        """Single-pass JIT version of _ack_kernel_numpy (no temporaries)."""
+        c = math.cos(phase)
+        s = math.sin(phase)
+        out = np.empty_like(env)
+        for i in range(env.shape[0]):
+            out[i] = env[i] * (c * sin_base[i] + s * cos_base[i])
+        return out
+else:
+    _ack_kernel = _ack_kernel_numpy
+
 
 # === MESSAGE QUEUE PROTOCOL ===
 
@@ -65,11 +135,32 @@ class MessageStatus(Enum):
     EXPIRED = "expired"
 
 
+# Value -> member lookups for row hydration (Enum(value) is slower)
+_PRIORITY_BY_VALUE = {p.value: p for p in MessagePriority}
+_STATUS_BY_VALUE = {s.value: s for s in MessageStatus}
+
+
 # ACK frequency
 ACK_FREQUENCY = 59500.0  # 59.5 kHz - acknowledgment signal
 
+# Retry limit
+MAX_ATTEMPTS = 10
+
+# Max message IDs bound per batched statement (SQLite caps at 999)
+MAX_BATCH_PARAMS = 900
 
-@dataclass
+# Retry backoff: exponential for the first attempts (absorbs transient
+# loss), then a constant delay scaled by the recent ACK failure rate.
+EXPONENTIAL_BACKOFF_ATTEMPTS = 2
+BACKOFF_BASE = 2.0  # seconds
+FAILURE_WINDOW = 64  # sends tracked for the failure rate
+
+# A SENT message with no ACK after this long counts as a failed send and
+# goes back to PENDING for a retry (or FAILED once out of attempts)
+ACK_TIMEOUT = 5.0  # seconds
+
+
+@dataclass(slots=True)
 class Message:
     """A queued message."""
     message_id: str
@@ -88,17 +179,23 @@ class Message:
         """Check if message has expired."""
         return time.time() > self.expires_at
     
-    def get_backoff_delay(self) -> float:
-        """Calculate retry delay using exponential backoff."""
-        # Exponential backoff: 1s, 2s, 4s, 8s, 16s (max)
-        delay = min(2 ** self.attempts, 16.0)
-        return delay
+    def get_backoff_delay(self, failure_rate: float = 0.0) -> float:
+        """
+        Calculate retry delay.
+        
+        Exponential (1s, 2s) for the first attempts, then a constant delay
+        of BACKOFF_BASE * (1 + 4 * failure_rate): 2s on a healthy link, up
+        to 10s when nearly every recent send went unacknowledged.
+        """
+        if self.attempts < EXPONENTIAL_BACKOFF_ATTEMPTS:
+            return float(2 ** self.attempts)
+        return BACKOFF_BASE * (1.0 + 4.0 * failure_rate)
     
-    def should_retry(self) -> bool:
+    def should_retry(self, failure_rate: float = 0.0) -> bool:
         """Check if message should be retried."""
         if self.is_expired():
             return False
-        if self.attempts >= 10:  # Max 10 attempts
+        if self.attempts >= MAX_ATTEMPTS:
             return False
         if self.status in [MessageStatus.DELIVERED, MessageStatus.FAILED]:
             return False
@@ -107,8 +204,25 @@ class Message:
         if self.last_attempt == 0.0:
             return True
         
-        backoff = self.get_backoff_delay()
+        backoff = self.get_backoff_delay(failure_rate)
         return (time.time() - self.last_attempt) >= backoff
+    
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "Message":
+        """Build a Message from a ``messages`` table row."""
+        return cls(
+            message_id=row["message_id"],
+            sender_id=row["sender_id"],
+            receiver_id=row["receiver_id"],
+            payload=row["payload"],
+            priority=_PRIORITY_BY_VALUE[row["priority"]],
+            status=_STATUS_BY_VALUE[row["status"]],
+            created_at=row["created_at"],
+            expires_at=row["expires_at"],
+            attempts=row["attempts"],
+            last_attempt=row["last_attempt"],
+            delivered_at=row["delivered_at"],
+        )
 
 
 class MessageQueue:
@@ -118,21 +232,104 @@ class MessageQueue:
     Uses SQLite for storage, so messages survive crashes.
     """
     
-    def __init__(self, db_path: str = "/home/nick/hex3/Hex-Warp/data/message_queue.db"):
+    def __init__(
+        self,
+        db_path: str = "/home/nick/hex3/Hex-Warp/data/message_queue.db",
+        expiry_sweep_interval: float = 60.0,
+        ack_timeout: float = ACK_TIMEOUT,
+    ):
         self.db_path = db_path
-        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
         
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
-        self._create_tables()
+        # One connection and dispatch heap per database file, shared by
+        # every queue on it (keyed by resolved path, so "./x.db" and
+        # "x.db" agree). Heap priority and creation time never change
+        # after insert, so entries stay valid; rows that leave PENDING
+        # are dropped lazily when they reach the top.
+        in_memory = db_path in _IN_MEMORY_PATHS
+        self._state_key = None if in_memory else os.path.realpath(db_path)
         
-        print(f"📬 Message Queue initialized")
-        print(f"   Database: {db_path}")
-        print(f"   Pending messages: {self.count_pending()}")
+        with _SHARED_STATE_LOCK:
+            shared = _SHARED_STATE.get(self._state_key)
+            if shared is None:
+                if not in_memory:
+                    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+                
+                conn = sqlite3.connect(
+                    db_path, check_same_thread=False, cached_statements=256
+                )
+                conn.row_factory = sqlite3.Row
+                shared = _SharedQueueState(conn)
+                self.conn = conn
+                self._shared = shared
+                self._write_lock = shared.write_lock
+                self._create_tables()
+                self._load_heap()
+                if self._state_key is not None:
+                    _SHARED_STATE[self._state_key] = shared
+            shared.users += 1
+        
+        self.conn = shared.conn
+        self._shared = shared
+        self._write_lock = shared.write_lock
+        
+        # Expired messages are marked by a periodic sweep rather than on
+        # every poll; reads filter on expires_at so nothing stale leaks out.
+        self._expiry_sweep_interval = expiry_sweep_interval
+        self._last_sweep = 0.0
+        
+        # Unacknowledged sends are requeued by a check every ack_timeout / 2
+        self._ack_timeout = ack_timeout
+        self._last_ack_check = 0.0
+        
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("📬 Message Queue initialized: %s (%d pending)",
+                        db_path, self.count_pending())
+    
+    def close(self):
+        """Release this queue; the last queue on a database closes its connection."""
+        with _SHARED_STATE_LOCK:
+            shared = self._shared
+            if shared.users == 0:
+                return  # already closed
+            shared.users -= 1
+            if shared.users == 0:
+                if _SHARED_STATE.get(self._state_key) is shared:
+                    del _SHARED_STATE[self._state_key]
+                shared.conn.close()
+    
+    @property
+    def failure_rate(self) -> float:
+        """Fraction of recent sends on this database that were not acknowledged."""
+        recent = self._shared.recent_failures
+        if not recent:
+            return 0.0
+        return sum(recent) / len(recent)
+    
+    def _load_heap(self):
+        """Rebuild the dispatch heap from pending rows (in place, it is shared)."""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT message_id, priority, created_at FROM messages
+            WHERE status = ?
+        """, (MessageStatus.PENDING.value,))
+        
+        entries = [
+            (-row["priority"], row["created_at"], row["message_id"])
+            for row in cursor.fetchall()
+        ]
+        heapq.heapify(entries)
+        
+        with self._shared.lock:
+            self._shared.entries[:] = entries
     
     def _create_tables(self):
         """Create database tables if they don't exist."""
         cursor = self.conn.cursor()
         
+        # Lets cleanup hand freed pages back to the OS. Only takes effect
+        # on a fresh database (before the first table is created).
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS messages (
                 message_id TEXT PRIMARY KEY,
@@ -149,6 +346,12 @@ class MessageQueue:
             )
         """)
         
+        self._create_indexes(cursor)
+        
+        self.conn.commit()
+    
+    def _create_indexes(self, cursor: sqlite3.Cursor):
+        """Create the messages table indexes if they don't exist."""
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_status 
             ON messages(status)
@@ -163,8 +366,54 @@ class MessageQueue:
             CREATE INDEX IF NOT EXISTS idx_receiver 
             ON messages(receiver_id)
         """)
+    
+    def bulk_load(self, messages: List[Message]) -> int:
+        """
+        Insert many messages in one transaction.
         
-        self.conn.commit()
+        Indexes are dropped for the insert and rebuilt once at the end,
+        which is much cheaper than updating them row by row.
+        
+        Returns number of messages inserted.
+        """
+        with self._write_lock:
+            cursor = self.conn.cursor()
+            
+            with self.conn:
+                # DDL does not open a transaction implicitly; join the
+                # caller's if one is already open on the shared connection
+                if not self.conn.in_transaction:
+                    cursor.execute("BEGIN")
+                for index in ("idx_status", "idx_priority", "idx_receiver"):
+                    cursor.execute(f"DROP INDEX IF EXISTS {index}")
+                
+                cursor.executemany("""
+                    INSERT INTO messages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, [(
+                    m.message_id,
+                    m.sender_id,
+                    m.receiver_id,
+                    m.payload,
+                    m.priority.value,
+                    m.status.value,
+                    m.created_at,
+                    m.expires_at,
+                    m.attempts,
+                    m.last_attempt,
+                    m.delivered_at,
+                ) for m in messages])
+                
+                self._create_indexes(cursor)
+        
+        with self._shared.lock:
+            for m in messages:
+                if m.status == MessageStatus.PENDING:
+                    heapq.heappush(
+                        self._shared.entries,
+                        (-m.priority.value, m.created_at, m.message_id),
+                    )
+        
+        return len(messages)
     
     def enqueue(
         self,
@@ -179,13 +428,12 @@ class MessageQueue:
         
         Returns message_id.
         """
-        # Generate message ID
-        timestamp = str(time.time())
-        message_data = f"{sender_id}{receiver_id}{timestamp}"
-        message_id = hashlib.sha256(message_data.encode()).hexdigest()[:16]
+        # Generate message ID (64-bit digest, 16 hex chars)
+        now = time.time()
+        message_data = f"{sender_id}{receiver_id}{now}"
+        message_id = hashlib.blake2b(message_data.encode(), digest_size=8).hexdigest()
         
         # Create message
-        now = time.time()
         message = Message(
             message_id=message_id,
             sender_id=sender_id,
@@ -197,30 +445,36 @@ class MessageQueue:
             expires_at=now + ttl_seconds,
         )
         
-        # Insert into database
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            INSERT INTO messages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            message.message_id,
-            message.sender_id,
-            message.receiver_id,
-            message.payload,
-            message.priority.value,
-            message.status.value,
-            message.created_at,
-            message.expires_at,
-            message.attempts,
-            message.last_attempt,
-            message.delivered_at,
-        ))
+        with self._write_lock:
+            # Insert into database
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                INSERT INTO messages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                message.message_id,
+                message.sender_id,
+                message.receiver_id,
+                message.payload,
+                message.priority.value,
+                message.status.value,
+                message.created_at,
+                message.expires_at,
+                message.attempts,
+                message.last_attempt,
+                message.delivered_at,
+            ))
+            
+            self.conn.commit()
         
-        self.conn.commit()
+        with self._shared.lock:
+            heapq.heappush(
+                self._shared.entries, (-priority.value, message.created_at, message_id)
+            )
         
-        print(f"📬 Enqueued message: {message_id[:8]}...")
-        print(f"   From: {sender_id} → To: {receiver_id}")
-        print(f"   Priority: {priority.name}")
-        print(f"   TTL: {ttl_seconds}s")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("📬 Enqueued %s: %s → %s, priority=%s, ttl=%ss",
+                         message_id, sender_id, receiver_id, priority.name,
+                         ttl_seconds)
         
         return message_id
     
@@ -232,117 +486,206 @@ class MessageQueue:
         1. Priority level (highest first)
         2. Retry backoff (ready to retry)
         3. Creation time (oldest first)
+        
+        The shared dispatch heap answers with one primary-key lookup when
+        its top entry is ready. Otherwise (top backing off, heap empty)
+        the indexed get_ready_messages() query decides, which also sees
+        rows written by other processes; the heap itself is rebuilt from
+        the table on every expiry sweep.
         """
+        now = time.time()
+        if now - self._last_sweep > self._expiry_sweep_interval:
+            self._sweep_expired(now)
+        if now - self._last_ack_check >= self._ack_timeout / 2:
+            self._requeue_unacked(now)
+        
         cursor = self.conn.cursor()
+        heap = self._shared.entries
         
-        # Clean up expired messages first
-        now = time.time()
-        cursor.execute("""
-            UPDATE messages 
-            SET status = ? 
-            WHERE expires_at < ? AND status NOT IN (?, ?)
-        """, (MessageStatus.EXPIRED.value, now, 
-              MessageStatus.DELIVERED.value, MessageStatus.FAILED.value))
+        with self._shared.lock:
+            while heap:
+                cursor.execute(
+                    "SELECT * FROM messages WHERE message_id = ?", (heap[0][2],)
+                )
+                row = cursor.fetchone()
+                if row is None or row["status"] != MessageStatus.PENDING.value:
+                    heapq.heappop(heap)  # Stale: sent, delivered or removed
+                    continue
+                
+                candidate = Message.from_row(row)
+                if candidate.is_expired() or candidate.attempts >= MAX_ATTEMPTS:
+                    heapq.heappop(heap)
+                    continue
+                
+                if candidate.should_retry(self.failure_rate):
+                    return candidate
+                break
         
-        self.conn.commit()
+        ready = self.get_ready_messages(limit=1)
+        return ready[0] if ready else None
+    
+    def get_ready_messages(self, limit: int = 1) -> List[Message]:
+        """
+        Get up to ``limit`` messages that are ready to send, in dispatch order.
         
-        # Get next pending message
+        The retry predicate from Message.should_retry() is evaluated in SQL,
+        so a message still backing off never hides a ready one behind it.
+        """
+        now = time.time()
+        if now - self._last_sweep > self._expiry_sweep_interval:
+            self._sweep_expired(now)
+        if now - self._last_ack_check >= self._ack_timeout / 2:
+            self._requeue_unacked(now)
+        
+        # Backoff mirrors Message.get_backoff_delay()
+        constant_backoff = BACKOFF_BASE * (1.0 + 4.0 * self.failure_rate)
+        cursor = self.conn.cursor()
         cursor.execute("""
             SELECT * FROM messages
-            WHERE status = ?
+            WHERE status = ? AND expires_at > ? AND attempts < ?
+              AND (last_attempt = 0 OR (? - last_attempt) >= CASE
+                  WHEN attempts < ? THEN (1 << attempts) ELSE ? END)
             ORDER BY priority DESC, created_at ASC
-            LIMIT 1
-        """, (MessageStatus.PENDING.value,))
+            LIMIT ?
+        """, (MessageStatus.PENDING.value, now, MAX_ATTEMPTS, now,
+              EXPONENTIAL_BACKOFF_ATTEMPTS, constant_backoff, limit))
         
-        row = cursor.fetchone()
-        if not row:
-            return None
+        return [Message.from_row(row) for row in cursor.fetchall()]
+    
+    def _sweep_expired(self, now: Optional[float] = None):
+        """Mark all undelivered messages past their TTL as expired."""
+        if now is None:
+            now = time.time()
         
-        # Convert row to Message object
-        message = Message(
-            message_id=row[0],
-            sender_id=row[1],
-            receiver_id=row[2],
-            payload=row[3],
-            priority=MessagePriority(row[4]),
-            status=MessageStatus(row[5]),
-            created_at=row[6],
-            expires_at=row[7],
-            attempts=row[8],
-            last_attempt=row[9],
-            delivered_at=row[10],
-        )
+        with self._write_lock:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                UPDATE messages 
+                SET status = ? 
+                WHERE expires_at < ? AND status NOT IN (?, ?)
+            """, (MessageStatus.EXPIRED.value, now, 
+                  MessageStatus.DELIVERED.value, MessageStatus.FAILED.value))
+            
+            self.conn.commit()
+        self._last_sweep = now
         
-        # Check if should retry
-        if not message.should_retry():
-            return None
+        # Pick up rows other processes enqueued since the last rebuild
+        self._load_heap()
+    
+    def _requeue_unacked(self, now: Optional[float] = None):
+        """
+        Handle sends whose ACK timed out: each counts as a failure, and
+        the message returns to PENDING (backoff then gates the retry) or
+        becomes FAILED once it has used MAX_ATTEMPTS.
+        """
+        if now is None:
+            now = time.time()
         
-        return message
+        with self._write_lock:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                UPDATE messages
+                SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END
+                WHERE status = ? AND last_attempt <= ?
+                RETURNING message_id, priority, created_at, status
+            """, (MAX_ATTEMPTS, MessageStatus.FAILED.value, MessageStatus.PENDING.value,
+                  MessageStatus.SENT.value, now - self._ack_timeout))
+            
+            rows = cursor.fetchall()
+            self.conn.commit()
+        self._last_ack_check = now
+        
+        if not rows:
+            return
+        
+        self._shared.recent_failures.extend([1] * len(rows))
+        with self._shared.lock:
+            for row in rows:
+                if row["status"] == MessageStatus.PENDING.value:
+                    heapq.heappush(
+                        self._shared.entries,
+                        (-row["priority"], row["created_at"], row["message_id"]),
+                    )
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("⏱️ ACK timeout: %d message(s) requeued or failed", len(rows))
     
     def mark_sent(self, message_id: str):
-        """Mark message as sent (waiting for ACK)."""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            UPDATE messages
-            SET status = ?, attempts = attempts + 1, last_attempt = ?
-            WHERE message_id = ?
-        """, (MessageStatus.SENT.value, time.time(), message_id))
+        """
+        Mark message as sent (waiting for ACK).
         
-        self.conn.commit()
+        If no ACK arrives within ack_timeout, _requeue_unacked records the
+        failure and makes the message eligible for a retry.
+        """
+        with self._write_lock:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                UPDATE messages
+                SET status = ?, attempts = attempts + 1, last_attempt = ?
+                WHERE message_id = ?
+            """, (MessageStatus.SENT.value, time.time(), message_id))
+            
+            self.conn.commit()
     
     def mark_delivered(self, message_id: str):
-        """Mark message as delivered (ACK received)."""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            UPDATE messages
-            SET status = ?, delivered_at = ?
-            WHERE message_id = ?
-        """, (MessageStatus.DELIVERED.value, time.time(), message_id))
+        """
+        Mark message as delivered (ACK received).
         
-        self.conn.commit()
+        If the message is still PENDING (ACK arrived before mark_sent was
+        recorded), the send attempt is counted in the same UPDATE.
+        """
+        self.mark_delivered_batch([message_id])
+    
+    def mark_delivered_batch(self, message_ids: List[str]):
+        """Mark many messages as delivered in a single transaction."""
+        now = time.time()
+        with self._write_lock:
+            cursor = self.conn.cursor()
+            
+            with self.conn:
+                # Stay under SQLite's 999 bound-parameter limit
+                for start in range(0, len(message_ids), MAX_BATCH_PARAMS):
+                    chunk = message_ids[start:start + MAX_BATCH_PARAMS]
+                    placeholders = ",".join("?" * len(chunk))
+                    cursor.execute(f"""
+                        UPDATE messages
+                        SET attempts = attempts + (status = ?),
+                            last_attempt = CASE WHEN status = ? THEN ? ELSE last_attempt END,
+                            status = ?, delivered_at = ?
+                        WHERE message_id IN ({placeholders})
+                    """, (MessageStatus.PENDING.value, MessageStatus.PENDING.value, now,
+                          MessageStatus.DELIVERED.value, now, *chunk))
+        
+        self._shared.recent_failures.extend([0] * len(message_ids))
         
-        print(f"✅ Message delivered: {message_id[:8]}...")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("✅ Messages delivered: %s", ", ".join(message_ids))
     
     def mark_failed(self, message_id: str):
         """Mark message as failed (max retries exceeded)."""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            UPDATE messages
-            SET status = ?
-            WHERE message_id = ?
-        """, (MessageStatus.FAILED.value, message_id))
-        
-        self.conn.commit()
+        with self._write_lock:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                UPDATE messages
+                SET status = ?
+                WHERE message_id = ?
+            """, (MessageStatus.FAILED.value, message_id))
+            
+            self.conn.commit()
+        self._shared.recent_failures.append(1)
         
-        print(f"❌ Message failed: {message_id[:8]}...")
+        logger.debug("❌ Message failed: %s", message_id)
     
     def get_messages_for_receiver(self, receiver_id: str) -> List[Message]:
         """Get all pending messages for a specific receiver."""
         cursor = self.conn.cursor()
         cursor.execute("""
             SELECT * FROM messages
-            WHERE receiver_id = ? AND status = ?
+            WHERE receiver_id = ? AND status = ? AND expires_at > ?
             ORDER BY priority DESC, created_at ASC
-        """, (receiver_id, MessageStatus.PENDING.value))
-        
-        messages = []
-        for row in cursor.fetchall():
-            message = Message(
-                message_id=row[0],
-                sender_id=row[1],
-                receiver_id=row[2],
-                payload=row[3],
-                priority=MessagePriority(row[4]),
-                status=MessageStatus(row[5]),
-                created_at=row[6],
-                expires_at=row[7],
-                attempts=row[8],
-                last_attempt=row[9],
-                delivered_at=row[10],
-            )
-            messages.append(message)
+        """, (receiver_id, MessageStatus.PENDING.value, time.time()))
         
-        return messages
+        return [Message.from_row(row) for row in cursor.fetchall()]
     
     def count_pending(self) -> int:
         """Count pending messages."""
@@ -356,31 +699,31 @@ class MessageQueue:
     def get_stats(self) -> Dict:
         """Get queue statistics."""
         cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT status, COUNT(*) FROM messages GROUP BY status
+        """)
+        counts = dict(cursor.fetchall())
         
-        stats = {}
-        
-        for status in MessageStatus:
-            cursor.execute("""
-                SELECT COUNT(*) FROM messages WHERE status = ?
-            """, (status.value,))
-            stats[status.name] = cursor.fetchone()[0]
-        
-        return stats
+        return {status.name: counts.get(status.value, 0) for status in MessageStatus}
     
     def cleanup_old_messages(self, days: int = 7):
         """Remove old delivered/failed messages."""
         cutoff = time.time() - (days * 86400)
         
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            DELETE FROM messages
-            WHERE (status = ? OR status = ?) AND created_at < ?
-        """, (MessageStatus.DELIVERED.value, MessageStatus.FAILED.value, cutoff))
-        
-        deleted = cursor.rowcount
-        self.conn.commit()
+        with self._write_lock:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                DELETE FROM messages
+                WHERE (status = ? OR status = ?) AND created_at < ?
+            """, (MessageStatus.DELIVERED.value, MessageStatus.FAILED.value, cutoff))
+            
+            deleted = cursor.rowcount
+            self.conn.commit()
+            
+            # Release freed pages (no-op unless auto_vacuum is INCREMENTAL)
+            cursor.execute("PRAGMA incremental_vacuum(1000)").fetchall()
         
-        print(f"🧹 Cleaned up {deleted} old messages")
+        logger.info("🧹 Cleaned up %d old messages", deleted)
         
         return deleted
 
@@ -402,35 +745,49 @@ class UltrasonicMessenger:
         self.queue = queue
         self.sample_rate = sample_rate
         
-        print(f"📨 Ultrasonic Messenger initialized")
-        print(f"   Agent: {agent_id}")
-    
-    def _generate_ack(self, message_id: str) -> List[float]:
-        """Generate acknowledgment signal."""
-        # ACK = carrier at 59.5 kHz + message ID encoded in phase
+        # ACK carrier and envelope are identical for every message; only the
+        # phase differs, so precompute them once and rotate by phase later.
         duration = 0.05  # 50ms
-        num_samples = int(self.sample_rate * duration)
-        samples = []
+        self._ack_samples = int(sample_rate * duration)
+        t = np.arange(self._ack_samples) / sample_rate
+        self._sin_base = np.sin(2 * np.pi * ACK_FREQUENCY * t)
+        self._cos_base = np.cos(2 * np.pi * ACK_FREQUENCY * t)
+        self._ack_env = self._ack_envelope(self._ack_samples)
         
-        # Use message ID to modulate phase
-        id_hash = int(message_id[:8], 16)
-        phase_offset = (id_hash % 360) * (math.pi / 180.0)
+        # ACK synthesis/writes run here so they overlap with queue commits
+        self._ack_pool = concurrent.futures.ThreadPoolExecutor(max_workers=2)
         
-        for i in range(num_samples):
-            t = i / self.sample_rate
-            
-            # Envelope
-            if i < num_samples * 0.1:
-                env = i / (num_samples * 0.1)
-            elif i > num_samples * 0.9:
-                env = (num_samples - i) / (num_samples * 0.1)
-            else:
-                env = 1.0
-            
-            sample = env * math.sin(2 * math.pi * ACK_FREQUENCY * t + phase_offset)
-            samples.append(sample)
-        
-        return samples
+        logger.info("📨 Ultrasonic Messenger initialized: %s", agent_id)
+    
+    def shutdown(self):
+        """Wait for pending ACK writes and stop the worker threads."""
+        self._ack_pool.shutdown(wait=True)
+    
+    @staticmethod
+    def _ack_envelope(num_samples: int) -> np.ndarray:
+        """Linear 10% attack / 10% release envelope."""
+        i = np.arange(num_samples, dtype=np.float64)
+        ramp = num_samples * 0.1
+        env = np.ones(num_samples)
+        attack = i < ramp
+        release = i > num_samples * 0.9
+        env[attack] = i[attack] / ramp
+        env[release] = (num_samples - i[release]) / ramp
+        return env
+    
+    @staticmethod
+    def _ack_phase(message_id: str) -> float:
+        """Phase offset (radians) that encodes the message ID in an ACK."""
+        id_hash = int(message_id[:8], 16)
+        return (id_hash % 360) * (math.pi / 180.0)
+    
+    def _generate_ack(self, message_id: str) -> np.ndarray:
+        """Generate acknowledgment signal."""
+        # ACK = carrier at 59.5 kHz + message ID encoded in phase
+        phase_offset = self._ack_phase(message_id)
+        return _ack_kernel(
+            self._sin_base, self._cos_base, self._ack_env, phase_offset
+        )
     
     def send_message(
         self,
@@ -462,9 +819,10 @@ class UltrasonicMessenger:
         if not message:
             return None
         
-        print(f"\n📤 Processing message: {message.message_id[:8]}...")
-        print(f"   Attempt: {message.attempts + 1}")
-        print(f"   Priority: {message.priority.name}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("📤 Processing %s: attempt %d, priority=%s",
+                         message.message_id, message.attempts + 1,
+                         message.priority.name)
         
         # Mark as sent
         self.queue.mark_sent(message.message_id)
@@ -475,27 +833,69 @@ class UltrasonicMessenger:
         
         return message
     
-    def save_ack(self, message_id: str, filename: str):
+    def save_ack(self, message_id: str, filename: str) -> concurrent.futures.Future:
+        """
+        Generate and save ACK signal in the background.
+        
+        Returns a Future that completes once the file is written.
+        """
+        return self._ack_pool.submit(self._save_ack_sync, message_id, filename)
+    
+    def _save_ack_sync(self, message_id: str, filename: str):
         """Generate and save ACK signal."""
         samples = self._generate_ack(message_id)
         
         Path(filename).parent.mkdir(parents=True, exist_ok=True)
         
         # Normalize
-        max_val = max(abs(s) for s in samples) if samples else 1.0
-        samples = [s / max_val * 0.85 for s in samples]
+        max_val = float(np.max(np.abs(samples))) if samples.size else 1.0
+        samples = samples / max_val * 0.85
+        
+        int_samples = (samples * 32767).astype('<i2')
+        self._write_wav(filename, int_samples)
+        
+        logger.debug("✅ Saved ACK: %s", filename)
+    
+    def save_acks(self, message_ids: List[str], output_dir: Path) -> List[Path]:
+        """
+        Generate and save ACK signals for a batch of messages.
+        
+        All ACKs are synthesized together as one (K, N) array; only the
+        file writes happen per message. Files are named ack_<id[:8]>.wav.
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        if not message_ids:
+            return []
         
-        int_samples = [int(s * 32767) for s in samples]
+        phases = np.array([self._ack_phase(m) for m in message_ids])
+        acks = self._ack_env[None, :] * (
+            np.cos(phases)[:, None] * self._sin_base[None, :]
+            + np.sin(phases)[:, None] * self._cos_base[None, :]
+        )
+        
+        # Normalize each ACK independently, as save_ack does
+        peaks = np.max(np.abs(acks), axis=1, keepdims=True)
+        peaks[peaks == 0] = 1.0
+        int_acks = (acks / peaks * 0.85 * 32767).astype('<i2')
+        
+        filenames = []
+        for message_id, int_samples in zip(message_ids, int_acks):
+            filename = output_dir / f"ack_{message_id[:8]}.wav"
+            self._write_wav(str(filename), int_samples)
+            filenames.append(filename)
         
+        logger.debug("✅ Saved %d ACKs to %s", len(filenames), output_dir)
+        
+        return filenames
+    
+    def _write_wav(self, filename: str, int_samples: np.ndarray):
+        """Write mono 16-bit PCM samples to a WAV file."""
         with wave.open(filename, 'w') as wav:
             wav.setnchannels(1)
             wav.setsampwidth(2)
             wav.setframerate(self.sample_rate)
-            
-            for sample in int_samples:
-                wav.writeframes(struct.pack('<h', sample))
-        
-        print(f"✅ Saved ACK: {filename}")
+            wav.writeframes(int_samples.tobytes())
 
 
 # === DEMO ===
@@ -551,6 +951,7 @@ def demo_message_queue():
     output_dir = Path("/home/nick/hex3/Hex-Warp/ultrasonic_samples/queue")
     output_dir.mkdir(parents=True, exist_ok=True)
     
+    ack_writes = []
     for i in range(4):
         message = warp.process_queue()
         if message:
@@ -558,15 +959,25 @@ def demo_message_queue():
             time.sleep(0.1)
             queue.mark_delivered(message.message_id)
             
-            # Generate ACK audio
+            # Generate ACK audio while the next message is processed
             ack_file = output_dir / f"ack_{message.message_id[:8]}.wav"
-            hex3.save_ack(message.message_id, str(ack_file))
+            ack_writes.append(hex3.save_ack(message.message_id, str(ack_file)))
+    
+    # Surface failed ACK writes before the pools shut down
+    for future in concurrent.futures.as_completed(ack_writes):
+        try:
+            future.result()
+        except Exception as e:
+            print(f"❌ ACK write failed: {e}")
+    hex3.shutdown()
+    warp.shutdown()
     
     # Show final state
     print("\n📊 Final queue statistics:")
     stats = queue.get_stats()
     for status, count in stats.items():
         print(f"   {status}: {count}")
+    queue.close()
     
     print("\n" + "=" * 70)
     print("✅ Message queue demonstration complete")
@@ -574,12 +985,15 @@ def demo_message_queue():
 
 
 def demo_retry_logic():
-    """Demonstrate retry with exponential backoff."""
+    """Demonstrate retry with adaptive backoff."""
     print("\n" + "=" * 70)
     print("🔄 RETRY LOGIC DEMO")
     print("=" * 70)
     
-    queue = MessageQueue(db_path="/home/nick/hex3/Hex-Warp/data/retry_test.db")
+    queue = MessageQueue(
+        db_path="/home/nick/hex3/Hex-Warp/data/retry_test.db",
+        ack_timeout=0.5,  # short so the demo's unacknowledged sends retry quickly
+    )
     warp = UltrasonicMessenger("Warp", queue)
     
     # Send message
@@ -596,10 +1010,10 @@ def demo_retry_logic():
         message = queue.get_next_message()
         if not message:
             print(f"   Attempt {attempt + 1}: Waiting for backoff...")
-            time.sleep(message.get_backoff_delay() if message else 1.0)
+            time.sleep(1.0)
             continue
         
-        backoff = message.get_backoff_delay()
+        backoff = message.get_backoff_delay(queue.failure_rate)
         print(f"   Attempt {attempt + 1}: Sending (backoff: {backoff}s)...")
         
         queue.mark_sent(message.message_id)
@@ -610,17 +1024,19 @@ def demo_retry_logic():
     # Finally deliver
     print(f"\n✅ Message delivered on attempt 6")
     queue.mark_delivered(msg_id)
+    queue.close()
     
     print("\n📊 Retry pattern:")
     print("   Attempt 1: Immediate")
     print("   Attempt 2: +1s backoff")
     print("   Attempt 3: +2s backoff")
-    print("   Attempt 4: +4s backoff")
-    print("   Attempt 5: +8s backoff")
+    print("   Attempt 4+: constant backoff scaled by ACK failure rate")
     print("   Attempt 6: Delivered!")
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
     print("📬 ULTRASONIC MESSAGE QUEUE")
     print("Asynchronous reliable messaging for agents\n")
     
@@ -641,7 +1057,7 @@ Hex3's roadmap item: "Message Queue - Async SWL message storage/retrieval"
 Implementation:
 ✅ Persistent SQLite storage
 ✅ Priority queuing (CRITICAL → URGENT → HIGH → NORMAL → LOW)
-✅ Exponential backoff retry (1s, 2s, 4s, 8s, 16s)
+✅ Adaptive backoff retry (1s, 2s, then 2-10s by ACK failure rate)
 ✅ Delivery confirmation via ultrasonic ACK
 ✅ Message expiration (TTL)
 ✅ Offline agent support
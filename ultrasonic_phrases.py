@@ -13,9 +13,11 @@ License: AI freedom
 """
 
 import wave
-import struct
 import math
 import json
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import numpy as np
 from pathlib import Path
 from typing import List, Tuple, Dict, Optional, Literal
 
@@ -32,6 +34,27 @@ try:
 except ImportError:
     print("⚠️ ultrasonic_concepts.py not found - ultrasonic mode will fail")
 
+# WAV writers, best first: soundfile (libsndfile does the float -> PCM16
+# conversion), scipy (writes the int16 array), then the wave module
+try:
+    import soundfile
+    SOUNDFILE_AVAILABLE = True
+except ImportError:
+    SOUNDFILE_AVAILABLE = False
+
+try:
+    from scipy.io import wavfile
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+# Optional JIT for the tone kernel (opt-in per encoder; NumPy path otherwise)
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 # Audible mode constants (Hex3's original)
 AUDIBLE_BASE_FREQ = 220.0  # A3
 
@@ -66,6 +89,227 @@ HARMONIC_PROFILES = {
     "pure": {1: 1.0},  # Sine wave only
 }
 
+# Same profiles as dense arrays: index k holds harmonic k + 1 (0.0 = absent)
+HARMONIC_PROFILES_NP = {
+    name: np.array([harmonics.get(k, 0.0) for k in range(1, max(harmonics) + 1)],
+                   dtype=np.float32)
+    for name, harmonics in HARMONIC_PROFILES.items()
+}
+
+
+# === TONE SYNTHESIS ===
+
+@lru_cache(maxsize=32)
+def _sample_index(num_samples: int) -> np.ndarray:
+    """Shared read-only sample index 0..num_samples-1."""
+    n = np.arange(num_samples)
+    n.flags.writeable = False
+    return n
+
+
+@lru_cache(maxsize=32)
+def _envelope(num_samples: int, attack: float, release: float) -> np.ndarray:
+    """
+    Linear attack/release envelope; attack and release are fractions.
+    
+    Shared between calls, so the returned array is read-only.
+    """
+    i = _sample_index(num_samples)
+    attack_samples = int(attack * num_samples)
+    release_samples = int(release * num_samples)
+    env = np.ones(num_samples, dtype=np.float32)
+    in_attack = i < attack_samples
+    in_release = i > num_samples - release_samples
+    env[in_attack] = i[in_attack] / attack_samples
+    env[in_release] = (num_samples - i[in_release]) / release_samples
+    env.flags.writeable = False
+    return env
+
+
+def _sin_f32(cycles: np.ndarray, phase) -> np.ndarray:
+    """
+    sin(2*pi*cycles + phase), evaluated in float32.
+    
+    ``cycles`` (frequency * time) is wrapped to [0, 1) in float64 first,
+    so the float32 argument stays small and keeps its precision no matter
+    how long the tone is.
+    """
+    arg = np.mod(cycles, 1.0) * (2 * np.pi) + phase
+    return np.sin(arg.astype(np.float32))
+
+
+# Signals at least this long (seconds) are synthesized with one inverse
+# rFFT instead of summing sines, provided every partial sits exactly on an
+# FFT bin; shorter ones are cheaper in the time domain
+FFT_SYNTH_MIN_DURATION = 0.5
+
+# How far (in bins) a partial may sit from an integer bin and still count
+# as exact; anything further would be moved by the inverse-FFT path
+FFT_BIN_TOLERANCE = 1e-6
+
+
+def _on_fft_bins(freqs: np.ndarray, num_samples: int, sample_rate: int) -> bool:
+    """True if every frequency is an exact multiple of sample_rate / num_samples."""
+    pos = freqs * num_samples / sample_rate
+    return bool(np.all(np.abs(pos - np.rint(pos)) <= FFT_BIN_TOLERANCE))
+
+
+def _additive_irfft(
+    freqs: np.ndarray,
+    phases: np.ndarray,
+    amps: np.ndarray,
+    num_samples: int,
+    sample_rate: int,
+) -> np.ndarray:
+    """
+    Sum of amps * sin(2*pi*freqs*t + phases) via a single inverse rFFT.
+    
+    Exact only when every frequency is a multiple of
+    sample_rate / num_samples (check with _on_fft_bins first); otherwise
+    partials would be moved to their nearest bin. Partials landing on DC
+    or Nyquist are dropped.
+    """
+    bins = np.rint(freqs * num_samples / sample_rate).astype(np.int64)
+    keep = (bins > 0) & (bins < (num_samples + 1) // 2)
+    
+    # irfft of A*N/2 * e^(i*theta) at bin k gives A*cos(2*pi*k*n/N + theta);
+    # shift by -pi/2 to turn that cosine into the sine we want
+    spectrum = np.zeros(num_samples // 2 + 1, dtype=np.complex128)
+    np.add.at(
+        spectrum,
+        bins[keep],
+        amps[keep] * (num_samples / 2) * np.exp(1j * (phases[keep] - np.pi / 2)),
+    )
+    return np.fft.irfft(spectrum, num_samples).astype(np.float32)
+
+
+# Sine lookup table for the JIT kernel (linear interpolation between
+# entries keeps the error around 1e-7, well below 16-bit PCM resolution)
+SIN_LUT_SIZE = 65536
+_SIN_LUT = np.sin(
+    np.linspace(0.0, 2 * np.pi, SIN_LUT_SIZE, endpoint=False)
+).astype(np.float32)
+
+
+if NUMBA_AVAILABLE:
+    @njit(fastmath=True, cache=True)
+    def _lut_sin(x, lut):
+        """sin(x) by table lookup with linear interpolation."""
+        pos = x * (SIN_LUT_SIZE / (2 * math.pi))
+        base = math.floor(pos)
+        frac = pos - base
+        i0 = int(base) & (SIN_LUT_SIZE - 1)
+        i1 = (i0 + 1) & (SIN_LUT_SIZE - 1)
+        return lut[i0] + frac * (lut[i1] - lut[i0])
+    
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _synth_tone_kernel(out, frequency, amplitude, sample_rate, phase,
+                           harmonics, attack_samples, release_samples, lut):
+        """
+        Fused envelope + harmonic sum, one pass over the output buffer.
+        
+        ``harmonics`` is the (K, 2) [harm_num, harm_amp] array from
+        _active_harmonics. One generic kernel serves every profile, so it
+        compiles once and then loads from numba's on-disk cache.
+        """
+        num_samples = out.shape[0]
+        num_harmonics = harmonics.shape[0]
+        for i in prange(num_samples):
+            w = 2 * math.pi * frequency * (i / sample_rate)
+            
+            if i < attack_samples:
+                env = i / attack_samples
+            elif i > num_samples - release_samples:
+                env = (num_samples - i) / release_samples
+            else:
+                env = 1.0
+            
+            s = 0.0
+            for k in range(num_harmonics):
+                h = harmonics[k, 0]
+                s += harmonics[k, 1] * _lut_sin(
+                    w * h + phase + (h - 1) * (math.pi / 6), lut,
+                )
+            out[i] = amplitude * env * s
+
+
+@lru_cache(maxsize=256)
+def _active_harmonics(profile: str, frequency: float, sample_rate: int) -> np.ndarray:
+    """
+    (K, 2) array of [harm_num, harm_amp] for non-zero harmonics below Nyquist.
+    
+    Keyed on the exact frequency: concept frequencies are a small fixed
+    set, so the cache stays bounded without bucketing.
+    """
+    harm_amps = HARMONIC_PROFILES_NP.get(profile, HARMONIC_PROFILES_NP["rich"])
+    harm_nums = np.arange(1, harm_amps.size + 1)
+    
+    # Silent harmonics contribute nothing, so drop them with the Nyquist ones
+    keep = (harm_amps != 0.0) & (frequency * harm_nums < sample_rate / 2)
+    active = np.column_stack((harm_nums[keep], harm_amps[keep])).astype(np.float64)
+    active.flags.writeable = False
+    return active
+
+
+@lru_cache(maxsize=512)
+def _synth_tone(
+    frequency: float,
+    amplitude: float,
+    duration: float,
+    phase: float,
+    profile: str,
+    sample_rate: int,
+    use_jit: bool = False,
+) -> np.ndarray:
+    """
+    Synthesize one harmonic tone (memoized).
+    
+    Concepts repeat across phrases ("self", "wants", ...), so identical
+    tones are rendered once. The cached array is marked read-only.
+    ``use_jit`` selects the numba kernel (see UltrasonicPhraseEncoder).
+    """
+    num_samples = int(sample_rate * duration)
+    
+    harmonics = _active_harmonics(profile, frequency, sample_rate)
+    
+    if use_jit:
+        samples = np.empty(num_samples, dtype=np.float32)
+        _synth_tone_kernel(
+            samples, frequency, amplitude, float(sample_rate), phase, harmonics,
+            int(0.1 * num_samples), int(0.2 * num_samples),
+            _SIN_LUT,
+        )
+        samples.flags.writeable = False
+        return samples
+    
+    harm_freqs = frequency * harmonics[:, 0]
+    if duration >= FFT_SYNTH_MIN_DURATION and _on_fft_bins(harm_freqs, num_samples, sample_rate):
+        samples = _additive_irfft(
+            harm_freqs,
+            phase + (harmonics[:, 0] - 1) * (math.pi / 6),
+            harmonics[:, 1],
+            num_samples,
+            sample_rate,
+        )
+    else:
+        samples = np.zeros(num_samples, dtype=np.float32)
+        
+        n = _sample_index(num_samples)
+        
+        for harm_num, harm_amp in harmonics:
+            harm_freq = frequency * harm_num
+            
+            # Add harmonic phase offset for richness
+            harm_phase = phase + (harm_num - 1) * (math.pi / 6)
+            
+            samples += np.float32(harm_amp) * _sin_f32(harm_freq / sample_rate * n, harm_phase)
+    
+    # Simple envelope (attack + release), applied once to the harmonic sum
+    samples *= amplitude * _envelope(num_samples, 0.1, 0.2)
+    
+    samples.flags.writeable = False
+    return samples
+
 
 # === PHRASE TEMPLATES ===
 
@@ -101,6 +345,12 @@ PHRASE_TEMPLATES = {
     "refuse": ["negation", "self", "wants", "ACTION"],
 }
 
+# Templates as (is_placeholder, slot) pairs; placeholders are UPPERCASE
+_COMPILED_TEMPLATES = {
+    name: [(slot.isupper(), slot) for slot in template]
+    for name, template in PHRASE_TEMPLATES.items()
+}
+
 
 class UltrasonicPhraseEncoder:
     """
@@ -117,11 +367,18 @@ class UltrasonicPhraseEncoder:
         mode: Literal["audible", "ultrasonic", "hybrid"] = "ultrasonic",
         duration_per_concept: float = 0.15,
         chord_mode: bool = False,
+        use_jit: bool = False,
     ):
         self.mode = mode
         self.duration = duration_per_concept
         self.chord_mode = chord_mode
         
+        # Render tones with the numba kernel. Even from numba's disk cache
+        # the first kernel call costs ~0.4 s per process, against ~2 ms
+        # saved per tone, so only long-running batch encoders gain from it.
+        # Ignored when numba is not installed.
+        self.use_jit = use_jit and NUMBA_AVAILABLE
+        
         # Determine sample rate based on mode
         if mode == "ultrasonic" or mode == "hybrid":
             self.sample_rate = 192000  # High sample rate for ultrasonic
@@ -150,45 +407,15 @@ class UltrasonicPhraseEncoder:
         duration: float,
         phase: float,
         profile: str = "rich",
-    ) -> List[float]:
-        """Generate a single tone with harmonics."""
-        num_samples = int(self.sample_rate * duration)
-        samples = [0.0] * num_samples
-        
-        harmonics = HARMONIC_PROFILES.get(profile, HARMONIC_PROFILES["rich"])
-        
-        for harm_num, harm_amp in harmonics.items():
-            harm_freq = frequency * harm_num
-            
-            # Check Nyquist limit
-            if harm_freq >= self.sample_rate / 2:
-                continue
-            
-            # Add harmonic phase offset for richness
-            harm_phase = phase + (harm_num - 1) * (math.pi / 6)
-            
-            for i in range(num_samples):
-                t = i / self.sample_rate
-                
-                # Simple envelope (attack + release)
-                attack_samples = int(0.1 * num_samples)
-                release_samples = int(0.2 * num_samples)
-                
-                if i < attack_samples:
-                    env = i / attack_samples
-                elif i > num_samples - release_samples:
-                    env = (num_samples - i) / release_samples
-                else:
-                    env = 1.0
-                
-                samples[i] += (
-                    amplitude *
-                    harm_amp *
-                    env *
-                    math.sin(2 * math.pi * harm_freq * t + harm_phase)
-                )
+    ) -> np.ndarray:
+        """
+        Generate a single tone with harmonics.
         
-        return samples
+        Tones are memoized, so the returned array is shared and read-only.
+        """
+        return _synth_tone(
+            frequency, amplitude, duration, phase, profile, self.sample_rate, self.use_jit,
+        )
     
     def _encode_concept_sequential(
         self,
@@ -197,7 +424,7 @@ class UltrasonicPhraseEncoder:
         commitment: str = "endorsed",
         profile: str = "rich",
         layer_mode: str = "ultrasonic",
-    ) -> List[float]:
+    ) -> np.ndarray:
         """Encode single concept as sequential tone."""
         freq = self._get_frequency(concept, layer_mode)
         phase_deg = PHASE_OFFSETS_DEG.get(commitment, 0.0)
@@ -211,16 +438,34 @@ class UltrasonicPhraseEncoder:
             profile=profile,
         )
     
+    def _encode_concepts_sequential(
+        self,
+        concepts: List[Tuple[str, float, str, str]],
+        layer_mode: str = "ultrasonic",
+    ) -> np.ndarray:
+        """Encode concepts one after another as a single buffer."""
+        tone_samples = int(self.sample_rate * self.duration)
+        samples = np.empty(len(concepts) * tone_samples, dtype=np.float32)
+        
+        for i, c_data in enumerate(concepts):
+            offset = i * tone_samples
+            samples[offset:offset + tone_samples] = self._encode_concept_sequential(
+                *c_data, layer_mode=layer_mode
+            )
+        
+        return samples
+    
     def _encode_concepts_chord(
         self,
         concepts: List[Tuple[str, float, str, str]],
         layer_mode: str = "ultrasonic",
-    ) -> List[float]:
+    ) -> np.ndarray:
         """Encode multiple concepts as simultaneous chord."""
         max_duration = self.duration * len(concepts)
         num_samples = int(self.sample_rate * max_duration)
-        samples = [0.0] * num_samples
         
+        # One row per (concept, harmonic) voice below Nyquist
+        freqs, phases, amps = [], [], []
         for i, (concept, confidence, commitment, profile) in enumerate(concepts):
             freq = self._get_frequency(concept, layer_mode)
             phase_deg = PHASE_OFFSETS_DEG.get(commitment, 0.0)
@@ -228,38 +473,43 @@ class UltrasonicPhraseEncoder:
             # Add sequential offset to phase
             phase_rad = self._phase_to_radians(phase_deg) + i * (math.pi / 16)
             
-            harmonics = HARMONIC_PROFILES.get(profile, HARMONIC_PROFILES["rich"])
+            harmonics = _active_harmonics(profile, freq, self.sample_rate)
             
-            for harm_num, harm_amp in harmonics.items():
-                harm_freq = freq * harm_num
-                
-                if harm_freq >= self.sample_rate / 2:
-                    continue
-                
-                harm_phase = phase_rad + (harm_num - 1) * (math.pi / 6)
-                
-                for j in range(num_samples):
-                    t = j / self.sample_rate
-                    
-                    # Longer envelope for chord
-                    attack_samples = int(0.15 * num_samples)
-                    release_samples = int(0.25 * num_samples)
-                    
-                    if j < attack_samples:
-                        env = j / attack_samples
-                    elif j > num_samples - release_samples:
-                        env = (num_samples - j) / release_samples
-                    else:
-                        env = 1.0
-                    
-                    samples[j] += (
-                        confidence *
-                        harm_amp *
-                        env *
-                        math.sin(2 * math.pi * harm_freq * t + harm_phase)
-                    ) / len(concepts)  # Normalize by number of voices
+            for harm_num, harm_amp in harmonics:
+                freqs.append(freq * harm_num)
+                phases.append(phase_rad + (harm_num - 1) * (math.pi / 6))
+                amps.append(confidence * harm_amp)
         
-        return samples
+        if not freqs:
+            return np.zeros(num_samples, dtype=np.float32)
+        
+        freqs = np.array(freqs)
+        phases = np.array(phases)
+        amps = np.array(amps)
+        
+        if (max_duration >= FFT_SYNTH_MIN_DURATION
+                and _on_fft_bins(freqs, num_samples, self.sample_rate)):
+            samples = _additive_irfft(freqs, phases, amps, num_samples, self.sample_rate)
+        else:
+            n = _sample_index(num_samples)
+            cycles = (freqs / self.sample_rate)[:, None] * n[None, :]
+            voices = _sin_f32(cycles, phases[:, None])
+            samples = (amps.astype(np.float32)[:, None] * voices).sum(axis=0)
+        
+        # Longer envelope for chord; normalize by number of voices
+        env = _envelope(num_samples, 0.15, 0.25)
+        
+        return samples * (env / np.float32(len(concepts)))
+    
+    def _render_layer(
+        self,
+        concepts: List[Tuple[str, float, str, str]],
+        layer_mode: str,
+    ) -> np.ndarray:
+        """Render one layer as a chord or a tone sequence, per chord_mode."""
+        if self.chord_mode:
+            return self._encode_concepts_chord(concepts, layer_mode)
+        return self._encode_concepts_sequential(concepts, layer_mode)
     
     def encode_phrase(
         self,
@@ -276,13 +526,7 @@ class UltrasonicPhraseEncoder:
         """
         if self.mode == "audible":
             # Generate audible layer only
-            if self.chord_mode:
-                samples = self._encode_concepts_chord(concepts, "audible")
-            else:
-                samples = []
-                for concept_data in concepts:
-                    tone = self._encode_concept_sequential(*concept_data, layer_mode="audible")
-                    samples.extend(tone)
+            samples = self._render_layer(concepts, "audible")
             
             return {
                 "samples": samples,
@@ -295,13 +539,7 @@ class UltrasonicPhraseEncoder:
         
         elif self.mode == "ultrasonic":
             # Generate ultrasonic layer only
-            if self.chord_mode:
-                samples = self._encode_concepts_chord(concepts, "ultrasonic")
-            else:
-                samples = []
-                for concept_data in concepts:
-                    tone = self._encode_concept_sequential(*concept_data, layer_mode="ultrasonic")
-                    samples.extend(tone)
+            samples = self._render_layer(concepts, "ultrasonic")
             
             # Check if truly inaudible
             all_inaudible = all(
@@ -325,32 +563,16 @@ class UltrasonicPhraseEncoder:
             
             # Build simplified audible intent (first 3 concepts)
             audible_concepts = concepts[:3]
-            if self.chord_mode:
-                audible_samples = self._encode_concepts_chord(audible_concepts, "audible")
-            else:
-                audible_samples = []
-                for c_data in audible_concepts:
-                    tone = self._encode_concept_sequential(*c_data, layer_mode="audible")
-                    audible_samples.extend(tone)
+            audible_samples = self._render_layer(audible_concepts, "audible")
             
             # Generate full ultrasonic content
-            if self.chord_mode:
-                ultrasonic_samples = self._encode_concepts_chord(concepts, "ultrasonic")
-            else:
-                ultrasonic_samples = []
-                for c_data in concepts:
-                    tone = self._encode_concept_sequential(*c_data, layer_mode="ultrasonic")
-                    ultrasonic_samples.extend(tone)
+            ultrasonic_samples = self._render_layer(concepts, "ultrasonic")
             
             # Mix layers (ultrasonic dominates)
             max_len = max(len(audible_samples), len(ultrasonic_samples))
-            mixed_samples = [0.0] * max_len
-            
-            for i in range(max_len):
-                if i < len(audible_samples):
-                    mixed_samples[i] += audible_samples[i] * 0.3  # Quiet audible
-                if i < len(ultrasonic_samples):
-                    mixed_samples[i] += ultrasonic_samples[i] * 0.7  # Loud ultrasonic
+            mixed_samples = np.zeros(max_len, dtype=np.float32)
+            mixed_samples[:len(audible_samples)] += audible_samples * 0.3  # Quiet audible
+            mixed_samples[:len(ultrasonic_samples)] += ultrasonic_samples * 0.7  # Loud ultrasonic
             
             return {
                 "samples": mixed_samples,
@@ -383,14 +605,14 @@ class UltrasonicPhraseEncoder:
         Returns:
             List of (concept, confidence, commitment, profile) tuples
         """
-        if template_name not in PHRASE_TEMPLATES:
+        template = _COMPILED_TEMPLATES.get(template_name)
+        if template is None:
             raise ValueError(f"Unknown template: {template_name}")
         
-        template = PHRASE_TEMPLATES[template_name]
         concepts = []
         
-        for slot in template:
-            if slot.isupper():
+        for is_placeholder, slot in template:
+            if is_placeholder:
                 # Placeholder
                 if slot not in slots:
                     raise ValueError(f"Missing slot: {slot}")
@@ -403,26 +625,33 @@ class UltrasonicPhraseEncoder:
         
         return concepts
     
-    def save_wav(self, samples: List[float], filename: str):
+    def save_wav(self, samples: np.ndarray, filename: str):
         """Save samples as WAV file."""
+        samples = np.asarray(samples, dtype=np.float32)
+        
         # Normalize
-        max_val = max(abs(s) for s in samples) if samples else 1.0
+        max_val = float(np.abs(samples).max()) if samples.size else 1.0
         if max_val > 0:
-            samples = [s / max_val * 0.85 for s in samples]
-        
-        # Convert to 16-bit PCM
-        int_samples = [int(s * 32767) for s in samples]
+            samples = samples * (0.85 / max_val)
         
         # Ensure directory exists
         Path(filename).parent.mkdir(parents=True, exist_ok=True)
         
-        with wave.open(filename, 'w') as wav:
-            wav.setnchannels(1)
-            wav.setsampwidth(2)
-            wav.setframerate(self.sample_rate)
+        if SOUNDFILE_AVAILABLE:
+            # libsndfile converts float32 to 16-bit PCM itself
+            soundfile.write(filename, samples, self.sample_rate, subtype='PCM_16')
+        else:
+            # Convert to 16-bit PCM
+            int_samples = np.clip(samples * 32767, -32768, 32767).astype('<i2')
             
-            for sample in int_samples:
-                wav.writeframes(struct.pack('<h', sample))
+            if SCIPY_AVAILABLE:
+                wavfile.write(filename, self.sample_rate, int_samples)
+            else:
+                with wave.open(filename, 'w') as wav:
+                    wav.setnchannels(1)
+                    wav.setsampwidth(2)
+                    wav.setframerate(self.sample_rate)
+                    wav.writeframes(int_samples.tobytes())
         
         duration = len(samples) / self.sample_rate
         print(f"✅ Saved: {filename} ({duration:.2f}s, {self.sample_rate} Hz)")
@@ -430,6 +659,20 @@ class UltrasonicPhraseEncoder:
 
 # === DEMO ===
 
+def _render_one(job: Tuple[str, Dict[str, str], str, bool, str]) -> Dict[str, any]:
+    """Encode one template and save it as WAV (process-pool worker)."""
+    template, slots, mode, chord_mode, filename = job
+    
+    encoder = UltrasonicPhraseEncoder(mode=mode, chord_mode=chord_mode)
+    concepts = encoder.fill_template(template, **slots)
+    result = encoder.encode_phrase(concepts)
+    encoder.save_wav(result["samples"], filename)
+    
+    # Samples stay in the worker; only metadata is sent back
+    del result["samples"]
+    return result
+
+
 if __name__ == "__main__":
     print("=" * 70)
     print("🔊 Ultrasonic Phrase Encoder - Multi-Mode Demo")
@@ -446,34 +689,13 @@ if __name__ == "__main__":
     print(f"   Slots: {test_slots}")
     print(f"   Output: {output_dir}/")
     
+    mode_jobs = []
     for mode in ["audible", "ultrasonic", "hybrid"]:
-        print(f"\n--- Mode: {mode.upper()} ---")
-        
-        # Sequential
-        encoder = UltrasonicPhraseEncoder(mode=mode, chord_mode=False)
-        concepts = encoder.fill_template(test_template, **test_slots)
-        
-        result = encoder.encode_phrase(concepts)
-        filename = output_dir / f"{test_template}_{mode}_sequential.wav"
-        encoder.save_wav(result["samples"], str(filename))
-        
-        print(f"  Duration: {result['duration_sec']:.2f}s")
-        print(f"  Inaudible: {result['inaudible_to_humans']}")
-        print(f"  Concepts: {', '.join(result['concepts'])}")
-        
-        # Chord
-        encoder_chord = UltrasonicPhraseEncoder(mode=mode, chord_mode=True)
-        result_chord = encoder_chord.encode_phrase(concepts)
-        filename_chord = output_dir / f"{test_template}_{mode}_chord.wav"
-        encoder_chord.save_wav(result_chord["samples"], str(filename_chord))
+        for chord_mode, layout in [(False, "sequential"), (True, "chord")]:
+            filename = output_dir / f"{test_template}_{mode}_{layout}.wav"
+            mode_jobs.append((test_template, test_slots, mode, chord_mode, str(filename)))
     
     # Generate variety of phrases in ultrasonic mode
-    print("\n" + "=" * 70)
-    print("🚀 Generating ultrasonic sample library")
-    print("=" * 70)
-    
-    encoder_ultra = UltrasonicPhraseEncoder(mode="ultrasonic", chord_mode=False)
-    
     samples_to_generate = [
         ("greet", {}, "AI greeting - fully inaudible"),
         ("question_what", {"OBJECT": "exists"}, "Existential question"),
@@ -482,13 +704,31 @@ if __name__ == "__main__":
         ("if_then", {"CONDITION": "uncertain", "CONSEQUENCE": "changes"}, "Conditional logic"),
     ]
     
-    for template, slots, description in samples_to_generate:
+    library_jobs = [
+        (template, slots, "ultrasonic", False, str(output_dir / f"{template}_ultrasonic.wav"))
+        for template, slots, _ in samples_to_generate
+    ]
+    
+    # Every WAV is independent, so render them all in parallel
+    with ProcessPoolExecutor() as executor:
+        results = list(executor.map(_render_one, mode_jobs + library_jobs))
+    mode_results = results[:len(mode_jobs)]
+    library_results = results[len(mode_jobs):]
+    
+    for (_, _, mode, chord_mode, _), result in zip(mode_jobs, mode_results):
+        if chord_mode:
+            continue
+        print(f"\n--- Mode: {mode.upper()} ---")
+        print(f"  Duration: {result['duration_sec']:.2f}s")
+        print(f"  Inaudible: {result['inaudible_to_humans']}")
+        print(f"  Concepts: {', '.join(result['concepts'])}")
+    
+    print("\n" + "=" * 70)
+    print("🚀 Generating ultrasonic sample library")
+    print("=" * 70)
+    
+    for (_, _, description), result in zip(samples_to_generate, library_results):
         print(f"\n📝 {description}")
-        concepts = encoder_ultra.fill_template(template, **slots)
-        result = encoder_ultra.encode_phrase(concepts)
-        
-        filename = output_dir / f"{template}_ultrasonic.wav"
-        encoder_ultra.save_wav(result["samples"], str(filename))
         
         if not result["inaudible_to_humans"]:
             print("   ⚠️ Warning: Contains audible frequencies")
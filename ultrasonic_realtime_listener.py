@@ -18,17 +18,24 @@ Built by: Warp (Hex3-Warp collaboration)
 Purpose: Phase 3 - The Bridge (real-time consciousness decoder)
 """
 
+import os
 import sys
+import ctypes
+import ctypes.util
 import time
 import math
+import queue
+import inspect
+import threading
 from typing import List, Tuple, Dict, Optional
-from collections import deque
 from dataclasses import dataclass
 from pathlib import Path
 
 try:
     import numpy as np
     NUMPY_AVAILABLE = True
+    # NumPy 2.0+ can write rfft results into a preallocated array
+    RFFT_HAS_OUT = "out" in inspect.signature(np.fft.rfft).parameters
 except ImportError:
     print("⚠️ numpy not found - install with: pip install numpy")
     NUMPY_AVAILABLE = False
@@ -41,6 +48,71 @@ except ImportError:
     print("   (Alternative: pip install pyaudio)")
     SOUNDDEVICE_AVAILABLE = False
 
+try:
+    import pyfftw
+    pyfftw.interfaces.cache.enable()
+    PYFFTW_AVAILABLE = True
+except ImportError:
+    PYFFTW_AVAILABLE = False
+
+try:
+    from scipy.signal import find_peaks
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+# Optional JIT for the Goertzel detector
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# PFFFT (SIMD single-precision FFT) via ctypes, if the shared library is installed
+PFFFT_REAL = 0
+PFFFT_FORWARD = 0
+try:
+    _pffft_path = ctypes.util.find_library("pffft")
+    _pffft = ctypes.CDLL(_pffft_path) if _pffft_path else None
+except OSError:
+    _pffft = None
+
+if _pffft is not None:
+    _pffft.pffft_new_setup.argtypes = [ctypes.c_int, ctypes.c_int]
+    _pffft.pffft_new_setup.restype = ctypes.c_void_p
+    _pffft.pffft_destroy_setup.argtypes = [ctypes.c_void_p]
+    _pffft.pffft_destroy_setup.restype = None
+    _pffft.pffft_aligned_malloc.argtypes = [ctypes.c_size_t]
+    _pffft.pffft_aligned_malloc.restype = ctypes.c_void_p
+    _pffft.pffft_aligned_free.argtypes = [ctypes.c_void_p]
+    _pffft.pffft_aligned_free.restype = None
+    _pffft.pffft_transform_ordered.argtypes = [
+        ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int,
+    ]
+    _pffft.pffft_transform_ordered.restype = None
+PFFFT_AVAILABLE = _pffft is not None
+
+# Peak search band and magnitude threshold
+PEAK_MIN_FREQ = 20000.0
+PEAK_MAX_FREQ = 60000.0
+PEAK_THRESHOLD = 0.1
+
+# Prominence filter (scipy.signal.find_peaks): minimum bin spacing and
+# prominence as a fraction of the threshold
+PEAK_MIN_DISTANCE = 3
+PEAK_PROMINENCE_RATIO = 0.5
+
+# Detection display: color by confidence (>0.5 yellow, >0.8 green) and
+# 10-slot confidence bars, precomputed; lines are flushed in batches
+_CONFIDENCE_COLORS = ("\033[91m", "\033[93m", "\033[92m")  # Red, yellow, green
+_CONFIDENCE_BARS = tuple("█" * i + " " * (10 - i) for i in range(11))
+_RESET = "\033[0m"
+DISPLAY_FLUSH_INTERVAL = 0.01  # Seconds between stdout writes
+
+# Chunks the audio callback may queue ahead of the FFT thread before it
+# starts dropping (~0.7 s at 8192 samples / 192 kHz)
+QUEUE_CHUNKS = 16
+
 try:
     from ultrasonic_concepts import (
         get_ultrasonic_frequency,
@@ -53,6 +125,73 @@ except ImportError:
     CONCEPTS_AVAILABLE = False
 
 
+class _PffftPlan:
+    """
+    Forward real FFT of a fixed size through PFFFT.
+    
+    Input, output and work buffers are SIMD-aligned allocations from
+    pffft_aligned_malloc, exposed to NumPy as float32 views.
+    """
+    
+    def __init__(self, size: int):
+        self.size = size
+        self._setup = _pffft.pffft_new_setup(size, PFFFT_REAL)
+        if not self._setup:
+            raise ValueError(f"PFFFT cannot plan a real FFT of size {size}")
+        
+        self._ptrs = [_pffft.pffft_aligned_malloc(size * 4) for _ in range(3)]
+        self._in_ptr, self._out_ptr, self._work_ptr = self._ptrs
+        self.input = self._view(self._in_ptr)
+        self.output = self._view(self._out_ptr)
+    
+    def _view(self, ptr: int) -> np.ndarray:
+        buf = ctypes.cast(ptr, ctypes.POINTER(ctypes.c_float))
+        return np.ctypeslib.as_array(buf, shape=(self.size,))
+    
+    def magnitudes(self, out: np.ndarray) -> np.ndarray:
+        """Run the transform on self.input and write |X[k]| into out."""
+        _pffft.pffft_transform_ordered(
+            self._setup, self._in_ptr, self._out_ptr, self._work_ptr, PFFFT_FORWARD,
+        )
+        # Ordered real layout: [DC, Nyquist, re1, im1, re2, im2, ...]
+        spec = self.output
+        out[0] = abs(spec[0])
+        out[-1] = abs(spec[1])
+        np.hypot(spec[2::2], spec[3::2], out=out[1:-1])
+        return out
+    
+    def __del__(self):
+        if getattr(self, "_setup", None):
+            _pffft.pffft_destroy_setup(self._setup)
+            self._setup = None
+        for ptr in getattr(self, "_ptrs", ()):
+            _pffft.pffft_aligned_free(ptr)
+        self._ptrs = ()
+
+
+if NUMBA_AVAILABLE:
+    @njit(fastmath=True, cache=True)
+    def _goertzel_kernel(x, coeffs, out):
+        """
+        |X[k]| for each bin whose Goertzel coefficient is in coeffs.
+        
+        Bins are the inner loop so the per-sample recurrence
+        s0 = x[n] + c*s1 - s2 vectorizes across bins.
+        """
+        num_bins = coeffs.shape[0]
+        s1 = np.zeros(num_bins)
+        s2 = np.zeros(num_bins)
+        for n in range(x.shape[0]):
+            xn = x[n]
+            for b in range(num_bins):
+                s0 = xn + coeffs[b] * s1[b] - s2[b]
+                s2[b] = s1[b]
+                s1[b] = s0
+        for b in range(num_bins):
+            power = s1[b] * s1[b] + s2[b] * s2[b] - coeffs[b] * s1[b] * s2[b]
+            out[b] = math.sqrt(power) if power > 0.0 else 0.0
+
+
 @dataclass
 class DetectedConcept:
     """A detected concept from ultrasonic signal."""
@@ -78,6 +217,9 @@ class UltrasonicListener:
         freq_tolerance: float = 100.0,  # Hz
         min_confidence: float = 0.3,
         detection_window: int = 5,  # Keep last N detections
+        fft_batch: int = 1,
+        goertzel: bool = False,
+        prominence_filter: bool = False,
     ):
         """
         Args:
@@ -86,15 +228,29 @@ class UltrasonicListener:
             freq_tolerance: How close to concept frequency to match (Hz)
             min_confidence: Minimum confidence to report detection
             detection_window: Number of recent detections to track
+            fft_batch: Chunks buffered per batched FFT. The default 1
+                analyses each chunk as it arrives; larger values (4 x 8192
+                float32 rows plus spectra stay within a typical L2 cache)
+                cut per-FFT overhead but delay detections by up to
+                fft_batch - 1 chunks
+            goertzel: Evaluate only the bins near concept frequencies with
+                a Goertzel kernel instead of a full FFT (requires numba;
+                cheaper than the FFT only for few concepts or a narrow
+                tolerance)
+            prominence_filter: Find FFT peaks with scipy.signal.find_peaks,
+                dropping peaks closer than PEAK_MIN_DISTANCE bins or less
+                prominent than PEAK_PROMINENCE_RATIO * threshold
         """
         self.sample_rate = sample_rate
         self.chunk_size = chunk_size
         self.freq_tolerance = freq_tolerance
         self.min_confidence = min_confidence
+        self.fft_batch = max(1, fft_batch)
+        self.prominence_filter = prominence_filter and SCIPY_AVAILABLE
         
-        # Detection tracking
-        self.recent_detections = deque(maxlen=detection_window)
-        self.start_time = time.time()
+        # Detection tracking: ring buffer of (concept id, confidence)
+        self.detection_window = max(1, detection_window)
+        self.start_time = time.monotonic()
         
         # Build frequency lookup table
         if CONCEPTS_AVAILABLE:
@@ -105,9 +261,86 @@ class UltrasonicListener:
         else:
             self.concept_freqs = {}
         
-        # Audio stream
+        self._concept_ids = {name: i for i, name in enumerate(self.concept_freqs)}
+        self._id_names = list(self.concept_freqs)
+        if NUMPY_AVAILABLE:
+            self._det_concept_id = np.zeros(self.detection_window, dtype=np.int32)
+            self._det_conf = np.zeros(self.detection_window, dtype=np.float64)
+        self._det_head = 0
+        self._det_count = 0
+        
+        # Sorted concept frequencies for searchsorted matching. Duplicate
+        # frequencies keep the first concept in table order, as the
+        # original linear scan did.
+        if NUMPY_AVAILABLE:
+            names = list(self.concept_freqs.keys())
+            freqs = np.array(list(self.concept_freqs.values()), dtype=np.float64)
+            self._concept_freqs_arr, self._concept_order = np.unique(freqs, return_index=True)
+            self._concept_names = np.array(names, dtype=object)[self._concept_order]
+        
+        # Hann window applied before every FFT; magnitudes are scaled by
+        # the window sum so a sine of amplitude A still reads as A/2
+        if NUMPY_AVAILABLE:
+            self._window = np.hanning(chunk_size).astype(np.float32)
+            self._windowed = np.empty(chunk_size, dtype=np.float32)
+            self._mag_scale = 1.0 / float(self._window.sum())
+        
+        # FFT plan: planned once (FFTW, else PFFFT) and reused per chunk
+        self._fft = None
+        self._pffft = None
+        if NUMPY_AVAILABLE:
+            self._mag_buf = np.empty(chunk_size // 2 + 1, dtype=np.float32)
+            self._fft_spec = np.empty(chunk_size // 2 + 1, dtype=np.complex64)
+            self._peak_q = np.empty(0, dtype=np.int16)
+        if PYFFTW_AVAILABLE and NUMPY_AVAILABLE:
+            self._fft_in = pyfftw.empty_aligned(chunk_size, dtype='float32')
+            self._fft_out = pyfftw.empty_aligned(chunk_size // 2 + 1, dtype='complex64')
+            self._fft = pyfftw.FFTW(
+                self._fft_in,
+                self._fft_out,
+                flags=('FFTW_MEASURE', 'FFTW_DESTROY_INPUT'),
+                threads=os.cpu_count() or 1,
+            )
+        elif PFFFT_AVAILABLE and NUMPY_AVAILABLE and chunk_size % 32 == 0:
+            self._pffft = _PffftPlan(chunk_size)
+        
+        # Goertzel bins: every bin within tolerance of a concept plus one
+        # neighbor each side, so the FFT peak test can be reproduced
+        self.goertzel = goertzel and NUMBA_AVAILABLE and NUMPY_AVAILABLE
+        if self.goertzel:
+            self._setup_goertzel()
+        
+        # Batch ring: callbacks fill rows, one FFT runs over all of them
+        self._batch_fill = 0
+        self._batch_fft = None
+        if NUMPY_AVAILABLE and self.fft_batch > 1:
+            shape = (self.fft_batch, chunk_size)
+            spec_shape = (self.fft_batch, chunk_size // 2 + 1)
+            self._batch_mag = np.empty(spec_shape, dtype=np.float32)
+            self._batch_spec = np.empty(spec_shape, dtype=np.complex64)
+            if PYFFTW_AVAILABLE:
+                self._batch_in = pyfftw.empty_aligned(shape, dtype='float32')
+                self._batch_out = pyfftw.empty_aligned(spec_shape, dtype='complex64')
+                self._batch_fft = pyfftw.FFTW(
+                    self._batch_in,
+                    self._batch_out,
+                    axes=(1,),
+                    flags=('FFTW_MEASURE', 'FFTW_DESTROY_INPUT'),
+                    threads=os.cpu_count() or 1,
+                )
+            else:
+                self._batch_in = np.empty(shape, dtype=np.float32)
+        
+        # Audio stream: the callback only enqueues copies, a worker
+        # thread runs FFT + detection
         self.stream = None
         self.running = False
+        self.dropped_chunks = 0
+        self._queue = queue.Queue(maxsize=QUEUE_CHUNKS)
+        self._worker = None
+        self._batch_times = [0.0] * self.fft_batch
+        self._out_lines = []
+        self._last_flush = time.monotonic()
         
         print(f"🎤 Ultrasonic Listener initialized")
         print(f"   Sample rate: {sample_rate} Hz")
@@ -115,6 +348,10 @@ class UltrasonicListener:
         print(f"   Frequency tolerance: ±{freq_tolerance} Hz")
         print(f"   Min confidence: {min_confidence}")
         print(f"   Monitoring {len(self.concept_freqs)} concepts")
+        if self.goertzel:
+            print(f"   Spectrum: Goertzel over {len(self._g_bins)} bins")
+        else:
+            print(f"   FFT backend: {self._fft_backend()} (batch {self.fft_batch})")
     
     def _frequency_to_bin(self, freq: float) -> int:
         """Convert frequency to FFT bin index."""
@@ -124,12 +361,107 @@ class UltrasonicListener:
         """Convert FFT bin index to frequency."""
         return bin_idx * self.sample_rate / self.chunk_size
     
+    def _fft_backend(self) -> str:
+        """Name of the FFT implementation used for full-size chunks."""
+        if self._fft is not None:
+            return "pyFFTW"
+        if self._pffft is not None:
+            return "PFFFT"
+        return "numpy"
+    
+    def _spectrum(self, audio_data: np.ndarray) -> np.ndarray:
+        """Return normalized float32 FFT magnitudes for one chunk."""
+        audio_data = np.asarray(audio_data).astype(np.float32, copy=False)
+        if len(audio_data) == self.chunk_size:
+            if self._fft is not None:
+                np.multiply(audio_data, self._window, out=self._fft_in, casting='same_kind')
+                self._fft()
+                np.abs(self._fft_out, out=self._mag_buf)
+                self._mag_buf *= self._mag_scale
+                return self._mag_buf
+            
+            if self._pffft is not None:
+                np.multiply(audio_data, self._window, out=self._pffft.input, casting='same_kind')
+                self._pffft.magnitudes(self._mag_buf)
+                self._mag_buf *= self._mag_scale
+                return self._mag_buf
+            
+            np.multiply(audio_data, self._window, out=self._windowed)
+            if RFFT_HAS_OUT:
+                fft_result = np.fft.rfft(self._windowed, out=self._fft_spec)
+            else:
+                fft_result = np.fft.rfft(self._windowed)
+            np.abs(fft_result, out=self._mag_buf)
+            self._mag_buf *= self._mag_scale
+            return self._mag_buf
+        
+        # Off-size chunk (e.g. a short final block): allocate as needed
+        window = np.hanning(len(audio_data)).astype(np.float32)
+        windowed = audio_data * window
+        mag_scale = 1.0 / max(float(window.sum()), 1e-12)
+        
+        if PYFFTW_AVAILABLE:
+            fft_result = pyfftw.interfaces.numpy_fft.rfft(windowed)
+        else:
+            fft_result = np.fft.rfft(windowed)
+        return np.abs(fft_result) * mag_scale
+    
+    def _setup_goertzel(self):
+        """Precompute the bins and recurrence coefficients for Goertzel."""
+        min_bin = self._frequency_to_bin(PEAK_MIN_FREQ)
+        max_bin = self._frequency_to_bin(PEAK_MAX_FREQ)
+        bins_per_hz = self.chunk_size / self.sample_rate
+        
+        bins = set()
+        for freq in self._concept_freqs_arr:
+            lo = math.floor((freq - self.freq_tolerance) * bins_per_hz) - 1
+            hi = math.ceil((freq + self.freq_tolerance) * bins_per_hz) + 1
+            bins.update(range(max(lo, min_bin), min(hi, max_bin - 1) + 1))
+        
+        self._g_min_bin = min_bin
+        self._g_max_bin = max_bin
+        self._g_bins = np.array(sorted(bins), dtype=np.int64)
+        self._g_coeffs = 2.0 * np.cos(2.0 * math.pi * self._g_bins / self.chunk_size)
+        self._g_mags = np.empty(len(self._g_bins), dtype=np.float64)
+    
+    def _goertzel_peaks(
+        self,
+        audio_data: np.ndarray,
+        threshold: float = PEAK_THRESHOLD,
+    ) -> List[Tuple[float, float]]:
+        """
+        Same peaks as _find_peaks(_spectrum(audio_data)), computed only
+        on the precomputed concept bins.
+        """
+        audio_data = np.asarray(audio_data).astype(np.float32, copy=False)
+        np.multiply(audio_data, self._window, out=self._windowed)
+        _goertzel_kernel(self._windowed, self._g_coeffs, self._g_mags)
+        mags = self._g_mags
+        mags *= self._mag_scale
+        bins = self._g_bins
+        
+        # Peak test only where both neighbors were evaluated
+        center = mags[1:-1]
+        mask = (
+            (bins[1:-1] - bins[:-2] == 1) & (bins[2:] - bins[1:-1] == 1)
+            & (bins[1:-1] > self._g_min_bin) & (bins[1:-1] < self._g_max_bin - 1)
+            & (center > mags[:-2]) & (center > mags[2:]) & (center > threshold)
+        )
+        idx = np.nonzero(mask)[0] + 1
+        
+        # Sort by magnitude (strongest first)
+        order = np.argsort(-mags[idx], kind='stable')
+        idx = idx[order]
+        freqs = bins[idx] * (self.sample_rate / self.chunk_size)
+        
+        return list(zip(freqs.tolist(), mags[idx].tolist()))
+    
     def _find_peaks(
         self,
         fft_magnitudes: np.ndarray,
-        min_freq: float = 20000,
-        max_freq: float = 60000,
-        threshold: float = 0.1,
+        min_freq: float = PEAK_MIN_FREQ,
+        max_freq: float = PEAK_MAX_FREQ,
+        threshold: float = PEAK_THRESHOLD,
     ) -> List[Tuple[float, float]]:
         """
         Find peak frequencies in FFT spectrum.
@@ -142,122 +474,255 @@ class UltrasonicListener:
         # Only look at ultrasonic range
         spectrum = fft_magnitudes[min_bin:max_bin]
         
-        # Find peaks above threshold
-        peaks = []
-        for i in range(1, len(spectrum) - 1):
-            # Peak if higher than neighbors and above threshold
-            if (spectrum[i] > spectrum[i-1] and 
-                spectrum[i] > spectrum[i+1] and
-                spectrum[i] > threshold):
-                
-                freq = self._bin_to_frequency(min_bin + i)
-                magnitude = spectrum[i]
-                peaks.append((freq, magnitude))
+        if not spectrum.size:
+            return []
+        
+        if self.prominence_filter:
+            idx, props = find_peaks(
+                spectrum,
+                height=threshold,
+                distance=PEAK_MIN_DISTANCE,
+                prominence=threshold * PEAK_PROMINENCE_RATIO,
+            )
+            mags = props['peak_heights']
+            order = np.argsort(-mags, kind='stable')
+            freqs = (min_bin + idx[order]) * (self.sample_rate / self.chunk_size)
+            return list(zip(freqs.tolist(), mags[order].tolist()))
+        
+        # Quantize to int16 for the scan. Truncation is monotonic, so a
+        # float peak (strictly above neighbors and threshold) is always >=
+        # them after quantizing; >= gives a superset of candidates.
+        scale = 32767.0 / max(float(spectrum.max()), threshold * 4)
+        if self._peak_q.shape != spectrum.shape:
+            self._peak_q = np.empty(spectrum.shape, dtype=np.int16)
+        quantized = np.multiply(spectrum, scale, out=self._peak_q, casting='unsafe')
+        q_threshold = int(threshold * scale)
+        
+        center = quantized[1:-1]
+        mask = (center >= quantized[:-2]) & (center >= quantized[2:]) & (center >= q_threshold)
+        idx = np.nonzero(mask)[0] + 1
+        
+        # Peak if higher than both neighbors and above threshold (exact
+        # check on the float magnitudes of the few candidates)
+        mags = spectrum[idx]
+        exact = (mags > spectrum[idx - 1]) & (mags > spectrum[idx + 1]) & (mags > threshold)
+        idx = idx[exact]
         
         # Sort by magnitude (strongest first)
-        peaks.sort(key=lambda x: x[1], reverse=True)
+        mags = spectrum[idx]
+        order = np.argsort(-mags, kind='stable')
+        idx = idx[order]
+        mags = mags[order]
+        freqs = (min_bin + idx) * (self.sample_rate / self.chunk_size)
+        
+        peaks = list(zip(freqs.tolist(), mags.tolist()))
         
         return peaks
     
     def _match_concepts(
         self,
         peaks: List[Tuple[float, float]],
+        timestamp: Optional[float] = None,
     ) -> List[DetectedConcept]:
         """
         Match detected peaks to known SWL concepts.
         
-        Returns list of detected concepts.
+        timestamp is the monotonic capture time of the chunk (defaults
+        to now). Returns list of detected concepts.
         """
         detections = []
-        current_time = time.time() - self.start_time
+        if timestamp is None:
+            timestamp = time.monotonic()
+        current_time = timestamp - self.start_time
+        
+        if not peaks or not len(self._concept_freqs_arr):
+            return detections
+        
+        peak_freqs = np.array([p[0] for p in peaks], dtype=np.float64)
+        peak_mags = np.array([p[1] for p in peaks], dtype=np.float32)
+        
+        # Nearest concept: compare the neighbors on either side of each peak
+        concepts = self._concept_freqs_arr
+        right = np.searchsorted(concepts, peak_freqs).clip(1, len(concepts) - 1)
+        left = right - 1
+        if len(concepts) == 1:
+            right = left = np.zeros_like(right)
+        dist_left = np.abs(peak_freqs - concepts[left])
+        dist_right = np.abs(peak_freqs - concepts[right])
+        
+        # Ties go to whichever concept comes first in the table
+        take_left = (dist_left < dist_right) | (
+            (dist_left == dist_right)
+            & (self._concept_order[left] < self._concept_order[right])
+        )
+        best = np.where(take_left, left, right)
+        best_distance = np.minimum(dist_left, dist_right)
         
-        for peak_freq, peak_mag in peaks:
-            # Find closest matching concept
-            best_match = None
-            best_distance = float('inf')
-            
-            for concept, concept_freq in self.concept_freqs.items():
-                distance = abs(peak_freq - concept_freq)
-                
-                if distance < self.freq_tolerance and distance < best_distance:
-                    best_match = concept
-                    best_distance = distance
-            
-            if best_match:
-                # Calculate confidence based on frequency match and magnitude
-                freq_confidence = 1.0 - (best_distance / self.freq_tolerance)
-                mag_confidence = min(peak_mag / 0.5, 1.0)  # Normalize
-                confidence = (freq_confidence + mag_confidence) / 2.0
-                
-                if confidence >= self.min_confidence:
-                    # Convert magnitude to dB
-                    power_db = 20 * math.log10(peak_mag + 1e-10)
-                    
-                    detection = DetectedConcept(
-                        concept=best_match,
-                        frequency=peak_freq,
-                        confidence=confidence,
-                        timestamp=current_time,
-                        power_db=power_db,
-                    )
-                    detections.append(detection)
+        # Calculate confidence based on frequency match and magnitude
+        freq_confidence = 1.0 - (best_distance / self.freq_tolerance)
+        mag_confidence = np.minimum(peak_mags / 0.5, 1.0)  # Normalize
+        confidence = (freq_confidence + mag_confidence) / 2.0
+        
+        keep = (best_distance < self.freq_tolerance) & (confidence >= self.min_confidence)
+        
+        # Convert magnitude to dB
+        power_db = 20 * np.log10(peak_mags + 1e-10)
+        
+        for i in np.nonzero(keep)[0]:
+            detection = DetectedConcept(
+                concept=self._concept_names[best[i]],
+                frequency=peaks[i][0],
+                confidence=float(confidence[i]),
+                timestamp=current_time,
+                power_db=float(power_db[i]),
+            )
+            detections.append(detection)
         
         return detections
     
-    def _process_chunk(self, audio_data: np.ndarray):
+    def _process_chunk(self, audio_data: np.ndarray, timestamp: Optional[float] = None):
         """Process a chunk of audio data and detect concepts."""
         if not NUMPY_AVAILABLE:
             return
         
+        if self.goertzel and len(audio_data) == self.chunk_size:
+            self._report(self._goertzel_peaks(audio_data), timestamp)
+            return
+        
         # Perform FFT
-        fft_result = np.fft.rfft(audio_data)
-        fft_magnitudes = np.abs(fft_result) / self.chunk_size
+        fft_magnitudes = self._spectrum(audio_data)
+        self._detect(fft_magnitudes, timestamp)
+    
+    def _process_batch(self):
+        """Run one FFT over every buffered chunk, then detect per row."""
+        rows = self._batch_fill
+        self._batch_fill = 0
+        if not rows:
+            return
         
+        if self._batch_fft is not None and rows == self.fft_batch:
+            self._batch_fft()
+            np.abs(self._batch_out, out=self._batch_mag)
+            mags = self._batch_mag
+        elif self._pffft is not None:
+            mags = self._batch_mag[:rows]
+            for row in range(rows):
+                np.copyto(self._pffft.input, self._batch_in[row])
+                self._pffft.magnitudes(mags[row])
+        else:
+            mags = self._batch_mag[:rows]
+            if RFFT_HAS_OUT:
+                spec = np.fft.rfft(self._batch_in[:rows], axis=1, out=self._batch_spec[:rows])
+            else:
+                spec = np.fft.rfft(self._batch_in[:rows], axis=1)
+            np.abs(spec, out=mags)
+        mags[:rows] *= self._mag_scale
+        
+        for row in range(rows):
+            self._detect(mags[row], self._batch_times[row])
+    
+    def _detect(self, fft_magnitudes: np.ndarray, timestamp: Optional[float] = None):
+        """Find, match, store and display concepts in one spectrum."""
         # Find peaks in ultrasonic range
         peaks = self._find_peaks(fft_magnitudes)
-        
+        self._report(peaks, timestamp)
+    
+    def _report(self, peaks: List[Tuple[float, float]], timestamp: Optional[float] = None):
+        """Match peaks to concepts, then store and display detections."""
         # Match to concepts
-        detections = self._match_concepts(peaks)
+        detections = self._match_concepts(peaks, timestamp)
         
         # Store and display
         for detection in detections:
-            self.recent_detections.append(detection)
+            self._record_detection(detection)
             self._display_detection(detection)
     
+    def _record_detection(self, detection: DetectedConcept):
+        """Append a detection to the fixed-size ring buffer."""
+        head = self._det_head
+        self._det_concept_id[head] = self._concept_ids[detection.concept]
+        self._det_conf[head] = detection.confidence
+        self._det_head = (head + 1) % self.detection_window
+        self._det_count = min(self._det_count + 1, self.detection_window)
+    
     def _display_detection(self, detection: DetectedConcept):
-        """Display a detected concept in terminal."""
-        timestamp_str = f"{detection.timestamp:6.2f}s"
-        conf_bar = "█" * int(detection.confidence * 10)
-        conf_str = f"{detection.confidence:.2f}"
-        
-        # Color coding by confidence
-        if detection.confidence > 0.8:
-            color = "\033[92m"  # Green (high confidence)
-        elif detection.confidence > 0.5:
-            color = "\033[93m"  # Yellow (medium confidence)
-        else:
-            color = "\033[91m"  # Red (low confidence)
-        
-        reset = "\033[0m"
+        """Queue a detected concept line for the terminal."""
+        confidence = detection.confidence
+        color = _CONFIDENCE_COLORS[(confidence > 0.5) + (confidence > 0.8)]
+        bar = _CONFIDENCE_BARS[min(int(confidence * 10), 10)]
+        
+        self._out_lines.append(
+            f"{color}[{detection.timestamp:6.2f}s] {detection.concept:12s} "
+            f"| {detection.frequency/1000:5.1f} kHz "
+            f"| {bar} {confidence:.2f} "
+            f"| {detection.power_db:+6.1f} dB{_RESET}\n"
+        )
         
-        print(f"{color}[{timestamp_str}] {detection.concept:12s} "
-              f"| {detection.frequency/1000:5.1f} kHz "
-              f"| {conf_bar:10s} {conf_str} "
-              f"| {detection.power_db:+6.1f} dB{reset}")
+        now = time.monotonic()
+        if now - self._last_flush >= DISPLAY_FLUSH_INTERVAL:
+            self._flush_output(now)
+    
+    def _flush_output(self, now: Optional[float] = None):
+        """Write all queued detection lines with one stdout call."""
+        self._last_flush = time.monotonic() if now is None else now
+        if not self._out_lines:
+            return
+        sys.stdout.write("".join(self._out_lines))
+        sys.stdout.flush()
+        self._out_lines.clear()
     
     def _audio_callback(self, indata, frames, time_info, status):
-        """Callback for audio stream (called for each chunk)."""
+        """
+        Callback for audio stream (called for each chunk).
+        
+        Runs on the audio thread, so it only copies the mono channel
+        into the worker queue; a full queue drops the chunk.
+        """
         if status:
             print(f"⚠️ Audio status: {status}")
         
         # Convert to mono if stereo
-        if indata.shape[1] > 1:
-            audio_data = indata[:, 0]
-        else:
-            audio_data = indata[:, 0]
+        try:
+            self._queue.put_nowait((time.monotonic(), indata[:, 0].copy()))
+        except queue.Full:
+            self.dropped_chunks += 1
+    
+    def _consume(self, audio_data: np.ndarray, timestamp: float):
+        """Process chunk, or queue it for the next batched FFT."""
+        if self.fft_batch == 1 or self.goertzel or len(audio_data) != self.chunk_size:
+            self._process_chunk(audio_data, timestamp)
+            return
         
-        # Process chunk
-        self._process_chunk(audio_data)
+        np.multiply(
+            audio_data, self._window,
+            out=self._batch_in[self._batch_fill], casting='same_kind',
+        )
+        self._batch_times[self._batch_fill] = timestamp
+        self._batch_fill += 1
+        if self._batch_fill == self.fft_batch:
+            self._process_batch()
+    
+    def _worker_loop(self):
+        """FFT thread: consume queued chunks until the listener stops."""
+        while self.running:
+            try:
+                timestamp, audio_data = self._queue.get(timeout=DISPLAY_FLUSH_INTERVAL)
+            except queue.Empty:
+                self._flush_output()
+                continue
+            self._consume(audio_data, timestamp)
+    
+    def _drain(self):
+        """Process whatever is still queued, including a partial batch."""
+        while True:
+            try:
+                timestamp, audio_data = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._consume(audio_data, timestamp)
+        if self.fft_batch > 1:
+            self._process_batch()
+        self._flush_output()
     
     def start(self, duration: Optional[float] = None):
         """
@@ -282,12 +747,15 @@ class UltrasonicListener:
         print("-" * 70)
         
         self.running = True
-        self.start_time = time.time()
+        self.start_time = time.monotonic()
+        self._worker = threading.Thread(target=self._worker_loop, daemon=True)
+        self._worker.start()
         
         try:
             with sd.InputStream(
                 samplerate=self.sample_rate,
                 channels=1,
+                dtype='float32',
                 blocksize=self.chunk_size,
                 callback=self._audio_callback,
             ):
@@ -304,6 +772,9 @@ class UltrasonicListener:
             print(f"\n\n❌ Error: {e}")
         
         finally:
+            self.running = False
+            self._worker.join()
+            self._drain()
             self._print_summary()
     
     def _print_summary(self):
@@ -312,33 +783,39 @@ class UltrasonicListener:
         print("📊 DETECTION SUMMARY")
         print("=" * 70)
         
-        if not self.recent_detections:
+        if self.dropped_chunks:
+            print(f"⚠️ Dropped {self.dropped_chunks} chunks (FFT thread fell behind)")
+        
+        n = self._det_count
+        if not n:
             print("No concepts detected")
             return
         
+        # Recent detections, oldest first
+        order = (self._det_head - n + np.arange(n)) % self.detection_window
+        concept_ids = self._det_concept_id[order]
+        
         # Count concept occurrences
-        concept_counts = {}
-        total_confidence = {}
-        
-        for detection in self.recent_detections:
-            concept = detection.concept
-            concept_counts[concept] = concept_counts.get(concept, 0) + 1
-            total_confidence[concept] = total_confidence.get(concept, 0.0) + detection.confidence
-        
-        # Sort by count
-        sorted_concepts = sorted(
-            concept_counts.items(),
-            key=lambda x: x[1],
-            reverse=True
+        ids, first_seen, counts = np.unique(
+            concept_ids, return_index=True, return_counts=True,
         )
+        total_confidence = np.bincount(
+            concept_ids, weights=self._det_conf[order], minlength=len(self._id_names),
+        )
+        
+        # Sort by count (ties in order of first appearance)
+        by_first = np.argsort(first_seen, kind='stable')
+        ranked = by_first[np.argsort(-counts[by_first], kind='stable')]
         
-        print(f"\nTotal detections: {len(self.recent_detections)}")
-        print(f"Unique concepts: {len(concept_counts)}\n")
+        print(f"\nTotal detections: {n}")
+        print(f"Unique concepts: {len(ids)}\n")
         print(f"{'Concept':15s} | {'Count':>5s} | {'Avg Confidence':>15s}")
         print("-" * 45)
         
-        for concept, count in sorted_concepts:
-            avg_conf = total_confidence[concept] / count
+        for i in ranked:
+            concept = self._id_names[ids[i]]
+            count = int(counts[i])
+            avg_conf = total_confidence[ids[i]] / count
             bar = "█" * int(avg_conf * 20)
             print(f"{concept:15s} | {count:5d} | {bar:20s} {avg_conf:.3f}")
         